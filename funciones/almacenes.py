@@ -0,0 +1,425 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from funciones import archivos, pronostico
+from funciones.archivos import leer_json, registrar_en_log, registrar_cambio, guardar_productos, bloquear
+from funciones.fechas import migrar_fechas, hoy_iso, es_fecha_iso
+from funciones.identidad import normalizar_texto, identidad_producto, buscar_clave_existente, indexar_producto
+
+RUTA_ALMACENES = "Data/almacenes"
+
+#Almacén sobre el que trabajan los flujos del menú. Con None se usa 'stock.json'.
+ALMACEN_ACTIVO = None
+
+
+@lru_cache(maxsize=256)
+def nombre_shard(categoria):
+    """
+    Genera el nombre de archivo del shard de una categoría.
+
+    Las categorías se normalizan para que 'Bebidas y Lácteos' y 'Bebidas y lácteos'
+    vayan al mismo archivo ('bebidas_y_lacteos.json').
+
+    Args:
+        categoria (str): Categoría del producto.
+
+    Returns:
+        str: Nombre del archivo del shard.
+    """
+    return (normalizar_texto(categoria).replace(" ", "_") or "sin_categoria") + ".json"
+
+
+def ruta_shard(almacen, categoria):
+    """
+    Devuelve la ruta del archivo donde se guardan los productos de una categoría de un almacén.
+
+    Args:
+        almacen (str): Nombre del almacén.
+        categoria (str): Categoría del producto.
+
+    Returns:
+        str: Ruta del archivo del shard.
+    """
+    return os.path.join(RUTA_ALMACENES, almacen, nombre_shard(categoria))
+
+
+def ruta_cambios(almacen):
+    """
+    Devuelve la ruta del registro de cambios de un almacén.
+
+    Args:
+        almacen (str): Nombre del almacén.
+
+    Returns:
+        str: Ruta del archivo '_cambios.jsonl' del almacén.
+    """
+    return os.path.join(RUTA_ALMACENES, almacen, "_cambios.jsonl")
+
+
+def listar_almacenes():
+    """
+    Lista los almacenes que tienen datos guardados.
+
+    Returns:
+        list: Nombres de los almacenes, ordenados alfabéticamente.
+    """
+    if not os.path.isdir(RUTA_ALMACENES):
+        return []
+    return sorted(
+        entrada.name for entrada in os.scandir(RUTA_ALMACENES) if entrada.is_dir()
+    )
+
+
+def leer_shard(ruta):
+    """
+    Lee un archivo de shard y devuelve sus productos.
+
+    Está definida a nivel de módulo para poder ejecutarse en otro proceso.
+
+    Args:
+        ruta (str): Ruta del archivo del shard.
+
+    Returns:
+        dict: Productos del shard. Si el archivo no existe o es inválido, un diccionario vacío.
+    """
+    if not os.path.exists(ruta):
+        return {}
+
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        try:
+            productos = json.load(archivo)
+        except json.JSONDecodeError:
+            return {}
+
+    migrar_fechas(productos)
+    return productos
+
+
+def cargar_almacenes(almacenes=None, procesos=None):
+    """
+    Carga el inventario de varios almacenes leyendo sus shards en paralelo con un pool de procesos.
+
+    Args:
+        almacenes (list, opcional): Almacenes a cargar. Por defecto, todos los existentes.
+        procesos (int, opcional): Cantidad máxima de procesos. Por defecto, la cantidad de CPUs.
+
+    Returns:
+        dict: Inventario de la forma {almacen: {clave: producto}}.
+    """
+    if almacenes is None:
+        almacenes = listar_almacenes()
+
+    #Se arma la lista de shards (almacén, ruta) a leer
+    shards = []
+    for almacen in almacenes:
+        carpeta = os.path.join(RUTA_ALMACENES, almacen)
+        if not os.path.isdir(carpeta):
+            continue
+        for entrada in os.scandir(carpeta):
+            #Los archivos que empiezan con "_" son del almacén, no shards (ej: '_pronostico.json')
+            if entrada.is_file() and entrada.name.endswith(".json") and not entrada.name.startswith("_"):
+                shards.append((almacen, entrada.path))
+
+    inventario = {almacen: {} for almacen in almacenes}
+    rutas = [ruta for _, ruta in shards]
+
+    #Con un solo shard no vale la pena levantar procesos
+    if len(rutas) <= 1:
+        resultados = map(leer_shard, rutas)
+        for (almacen, _), productos in zip(shards, resultados):
+            inventario[almacen].update(productos)
+        return inventario
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for (almacen, _), productos in zip(shards, pool.map(leer_shard, rutas)):
+            inventario[almacen].update(productos)
+    return inventario
+
+
+def guardar_shard(inventario, almacen, categoria):
+    """
+    Guarda solamente el shard de una categoría de un almacén. El resto de los
+    archivos, de ese y de los demás almacenes, no se reescribe.
+
+    Args:
+        inventario (dict): Inventario de la forma {almacen: {clave: producto}}.
+        almacen (str): Almacén cuyo shard se guarda.
+        categoria (str): Categoría del shard a guardar.
+
+    Returns:
+        None
+
+    Excepciones:
+        Puede lanzar IOError si ocurre un error al escribir el archivo.
+    """
+    nombre = nombre_shard(categoria)
+    productos = {
+        clave: producto for clave, producto in inventario.get(almacen, {}).items()
+        if nombre_shard(producto.get("categoria", "")) == nombre
+    }
+
+    ruta = ruta_shard(almacen, categoria)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(productos, archivo, indent=4, ensure_ascii=False)
+
+
+def usar_almacen(almacen):
+    """
+    Hace que los flujos del menú lean y guarden el stock en los shards de un almacén
+    en lugar de 'stock.json'. El registro de cambios y la caché del pronóstico pasan
+    a ser los del almacén ('_cambios.jsonl' y '_pronostico.json' en su carpeta).
+
+    Args:
+        almacen (str): Almacén a usar. Debe figurar en `listar_almacenes()`.
+
+    Returns:
+        None
+
+    Excepciones:
+        ValueError: Si el almacén no existe.
+    """
+    global ALMACEN_ACTIVO
+
+    if almacen not in listar_almacenes():
+        raise ValueError(f"El almacén '{almacen}' no existe. Almacenes: {', '.join(listar_almacenes()) or 'ninguno'}.")
+
+    ALMACEN_ACTIVO = almacen
+    carpeta = os.path.join(RUTA_ALMACENES, almacen)
+    archivos.RUTA_CAMBIOS = ruta_cambios(almacen)
+    pronostico.RUTA_PRONOSTICO = os.path.join(carpeta, "_pronostico.json")
+
+
+def leer_stock():
+    """
+    Lee el stock con el que trabajan los flujos del menú: el del almacén activo
+    o, si no hay uno, el de 'stock.json'.
+
+    Returns:
+        dict: Diccionario con los productos del inventario.
+    """
+    if ALMACEN_ACTIVO is None:
+        return leer_json()
+    return cargar_almacenes([ALMACEN_ACTIVO])[ALMACEN_ACTIVO]
+
+
+def guardar_stock(stock, claves, *categorias):
+    """
+    Guarda los cambios de los flujos del menú sin pisar lo que otros procesos hayan
+    guardado mientras tanto. Sin almacén activo se guarda en 'stock.json' (ver
+    `guardar_productos`); con un almacén activo solo se reescriben los shards de
+    las categorías indicadas, que se vuelven a leer con el almacén bloqueado.
+
+    Los productos que otro proceso cambió se actualizan en `stock` y en el índice
+    de identidades.
+
+    Args:
+        stock (dict): Diccionario con los productos del inventario. Se actualiza en el lugar.
+        claves (list): Claves de los productos agregados, modificados o eliminados.
+        *categorias (str): Categorías afectadas por el cambio. Si no se indica
+            ninguna, se guardan todas las del stock.
+
+    Returns:
+        None
+
+    Excepciones:
+        Puede lanzar IOError si ocurre un error al escribir el archivo.
+    """
+    if ALMACEN_ACTIVO is None:
+        actualizadas = guardar_productos(stock, claves)
+    else:
+        actualizadas = _guardar_en_almacen(stock, claves, categorias)
+
+    for clave in actualizadas:
+        indexar_producto(stock, clave)
+
+
+def _guardar_en_almacen(stock, claves, categorias):
+    if not categorias:
+        categorias = [producto.get("categoria", "") for producto in stock.values()]
+
+    #Una sola escritura por shard, aunque las categorías difieran en mayúsculas o tildes
+    shards = {nombre_shard(categoria): categoria for categoria in categorias}
+    carpeta = os.path.join(RUTA_ALMACENES, ALMACEN_ACTIVO)
+
+    with bloquear(os.path.join(carpeta, "_stock")):
+        guardado = {}
+        for nombre in shards:
+            guardado.update(leer_shard(os.path.join(carpeta, nombre)))
+        for clave in claves:
+            if clave in stock:
+                guardado[clave] = stock[clave]
+            else:
+                guardado.pop(clave, None)
+
+        #Se actualizan en memoria los productos de estos shards que cambió otro proceso
+        en_memoria = {
+            clave for clave, producto in stock.items()
+            if nombre_shard(producto.get("categoria", "")) in shards
+        }
+        actualizadas = [
+            clave for clave in guardado.keys() | en_memoria
+            if guardado.get(clave) != stock.get(clave)
+        ]
+        for clave in actualizadas:
+            if clave in guardado:
+                stock[clave] = guardado[clave]
+            else:
+                del stock[clave]
+
+        for categoria in shards.values():
+            guardar_shard({ALMACEN_ACTIVO: stock}, ALMACEN_ACTIVO, categoria)
+    return actualizadas
+
+
+def particionar_stock_json(almacen):
+    """
+    Reparte el contenido de 'stock.json' en los shards por categoría de un almacén.
+
+    Es una copia: 'stock.json' sigue siendo el stock por defecto y no se
+    sincroniza con los shards. Para trabajar sobre el almacén se usa `usar_almacen`.
+
+    Args:
+        almacen (str): Almacén al que se asigna el inventario actual.
+
+    Returns:
+        int: Cantidad de shards escritos.
+
+    Excepciones:
+        ValueError: Si el almacén ya tiene datos, para no pisarlos.
+    """
+    if cargar_almacenes([almacen])[almacen]:
+        raise ValueError(f"El almacén '{almacen}' ya tiene productos; no se vuelve a particionar.")
+
+    stock = leer_json()
+    inventario = {almacen: stock}
+
+    categorias = {}
+    for producto in stock.values():
+        categoria = producto.get("categoria", "")
+        categorias.setdefault(nombre_shard(categoria), categoria)
+
+    for categoria in categorias.values():
+        guardar_shard(inventario, almacen, categoria)
+
+    registrar_en_log(f"🏬 Se particionó stock.json en el almacén '{almacen}' ({len(categorias)} shards).")
+    return len(categorias)
+
+
+def cantidad_total(inventario, producto):
+    """
+    Suma la cantidad de un producto en todos los almacenes.
+
+    El producto se identifica por su identidad normalizada, por lo que se
+    encuentra aunque cada almacén lo haya cargado con una clave distinta.
+
+    Args:
+        inventario (dict): Inventario de la forma {almacen: {clave: producto}}.
+        producto (dict): Datos del producto a buscar ('nombre', 'marca' y 'presentacion').
+
+    Returns:
+        tuple: Una tupla con dos elementos:
+            - float: Cantidad total entre todos los almacenes.
+            - dict: Cantidad por almacén, solo de los almacenes que tienen el producto.
+    """
+    identidad = identidad_producto(producto)
+    por_almacen = {}
+
+    #Se recorre cada almacén por separado y luego se combinan los resultados
+    for almacen, stock in inventario.items():
+        cantidad = sum(
+            datos.get("cantidad", 0) for datos in stock.values()
+            if identidad_producto(datos) == identidad
+        )
+        if cantidad:
+            por_almacen[almacen] = cantidad
+
+    return sum(por_almacen.values()), por_almacen
+
+
+def productos_por_vencer(inventario, dias=7):
+    """
+    Lista los productos vencidos o que vencen en los próximos días, de todos los almacenes.
+
+    Args:
+        inventario (dict): Inventario de la forma {almacen: {clave: producto}}.
+        dias (int): Cantidad de días hacia adelante a considerar (por defecto: 7).
+
+    Returns:
+        list: Tuplas (almacen, clave, producto) ordenadas por fecha de vencimiento.
+            Los productos con fecha inválida se ignoran.
+    """
+    limite = hoy_iso(dias)
+    resultado = []
+
+    for almacen, stock in inventario.items():
+        for clave, producto in stock.items():
+            vencimiento = producto.get("vencimiento")
+            if not es_fecha_iso(vencimiento):
+                continue
+            if vencimiento <= limite:
+                resultado.append((vencimiento, almacen, clave, producto))
+
+    resultado.sort(key=lambda fila: fila[0])
+    return [fila[1:] for fila in resultado]
+
+
+def transferir(inventario, clave, origen, destino, cantidad, crear_destino=False):
+    """
+    Transfiere una cantidad de un producto de un almacén a otro.
+
+    En el destino se suma al producto equivalente si ya existe; si no, se crea.
+    Solo se guardan los shards de la categoría del producto en ambos almacenes, y
+    los dos lados quedan en el registro de cambios de su almacén con el motivo
+    'transferencia', para que el pronóstico no los cuente como consumo.
+    El almacén de destino tiene que existir, salvo que se pida crearlo.
+
+    Args:
+        inventario (dict): Inventario de la forma {almacen: {clave: producto}}.
+        clave (str): Clave del producto en el almacén de origen.
+        origen (str): Almacén de origen.
+        destino (str): Almacén de destino.
+        cantidad (float): Cantidad a transferir.
+        crear_destino (bool): Crear el almacén de destino si no existe (por defecto: False).
+
+    Returns:
+        dict: El inventario actualizado.
+
+    Excepciones:
+        ValueError: Si los almacenes son iguales, el destino no existe y no se pidió
+        crearlo, el producto no existe en el origen o la cantidad no es válida.
+    """
+    if origen == destino:
+        raise ValueError("El almacén de origen y el de destino deben ser distintos.")
+    if not crear_destino and destino not in listar_almacenes():
+        raise ValueError(f"El almacén de destino '{destino}' no existe.")
+    if clave not in inventario.get(origen, {}):
+        raise ValueError(f"El producto '{clave}' no existe en el almacén '{origen}'.")
+
+    producto = inventario[origen][clave]
+    if cantidad <= 0 or cantidad > producto.get("cantidad", 0):
+        raise ValueError(f"Cantidad inválida. Disponible en '{origen}': {producto.get('cantidad', 0)}.")
+
+    #Se descuenta del origen
+    producto["cantidad"] -= cantidad
+
+    #Se suma al producto equivalente del destino, o se crea
+    stock_destino = inventario.setdefault(destino, {})
+    existente = buscar_clave_existente(stock_destino, clave, producto)
+    if existente is not None:
+        stock_destino[existente]["cantidad"] += cantidad
+    else:
+        existente = clave
+        stock_destino[clave] = dict(producto, cantidad=cantidad)
+
+    #Se registran los dos lados, cada uno en el registro de cambios de su almacén
+    registrar_cambio(clave, producto, ruta=ruta_cambios(origen), motivo="transferencia")
+    registrar_cambio(existente, stock_destino[existente], ruta=ruta_cambios(destino), motivo="transferencia")
+
+    #Solo se reescriben los dos shards afectados
+    guardar_shard(inventario, origen, producto.get("categoria", ""))
+    guardar_shard(inventario, destino, stock_destino[existente].get("categoria", ""))
+
+    registrar_en_log(f"🚚 Se transfirieron {cantidad} de '{clave}' de '{origen}' a '{destino}'.")
+    return inventario
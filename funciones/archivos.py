@@ -1,14 +1,62 @@
 import json
+from contextlib import contextmanager
 from datetime import datetime
 import os
+from funciones.fechas import migrar_fechas
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 RUTA_JSON = "Data/stock.json"
 RUTA_LOG = "Data/registro.log"
+RUTA_CAMBIOS = "Data/cambios.jsonl"
+
+#Cantidad de escrituras de cada archivo que vio este proceso (ver `guardar_productos`)
+_escrituras_vistas = {}
+
+@contextmanager
+def bloquear(ruta):
+    """
+    Bloquea un archivo entre procesos mientras dura el bloque `with`.
+
+    El bloqueo se toma sobre un archivo aparte ('<ruta>.lock'), que además guarda
+    la cantidad de escrituras hechas bajo el bloqueo.
+
+    Args:
+        ruta (str): Archivo a bloquear.
+
+    Retorna:
+        Generador que entrega el archivo de bloqueo abierto.
+    """
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    descriptor = os.open(ruta + ".lock", os.O_RDWR | os.O_CREAT)
+    with open(descriptor, "r+b") as bloqueo:
+        if fcntl:
+            fcntl.flock(bloqueo, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(bloqueo.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield bloqueo
+        finally:
+            if fcntl:
+                fcntl.flock(bloqueo, fcntl.LOCK_UN)
+            else:
+                bloqueo.seek(0)
+                msvcrt.locking(bloqueo.fileno(), msvcrt.LK_UNLCK, 1)
 
-def leer_json():
+def leer_json(ruta=None):
     """
     Lee el archivo 'stock.json' y devuelve su contenido como un diccionario.
 
+    Las fechas guardadas en el formato anterior ('DD/MM/AAAA') se convierten
+    en memoria al formato interno 'AAAA-MM-DD'.
+
+    Args:
+        ruta (str, opcional): Archivo a leer. Por defecto, RUTA_JSON.
+
     Retorna:
         dict: Los datos leídos desde el archivo JSON. Si el archivo no existe 
         o contiene datos inválidos, se retorna un diccionario vacío.
@@ -16,25 +64,27 @@ def leer_json():
     Excepciones:
         json.JSONDecodeError: Si el contenido del archivo no es JSON válido.
         FileNotFoundError: No se lanza, ya que se maneja devolviendo {}.
-    
-    Nota:
-        No recibe parámetros.
     """
-    if not os.path.exists(RUTA_JSON):
+    ruta = ruta or RUTA_JSON
+    if not os.path.exists(ruta):
         return {}
 
-    with open(RUTA_JSON, "r", encoding="utf-8") as archivo:
+    with open(ruta, "r", encoding="utf-8") as archivo:
         try:
-            return json.load(archivo)
+            stock = json.load(archivo)
         except json.JSONDecodeError:
             return {}
 
-def guardar_json(stock):
+    migrar_fechas(stock)
+    return stock
+
+def guardar_json(stock, ruta=None):
     """
     Guarda el inventario completo en el archivo 'stock.json'.
 
     Args:
         stock (dict): Diccionario que contiene todo el inventario actual.
+        ruta (str, opcional): Archivo a escribir. Por defecto, RUTA_JSON.
 
     Retorna:
         None
@@ -42,15 +92,182 @@ def guardar_json(stock):
     Excepciones:
         Puede lanzar IOError si ocurre un error al escribir el archivo.
     """
-    with open(RUTA_JSON, "w", encoding="utf-8") as archivo:
+    with open(ruta or RUTA_JSON, "w", encoding="utf-8") as archivo:
         json.dump(stock, archivo, indent=4, ensure_ascii=False)
 
-def registrar_en_log(mensaje):
+def guardar_productos(stock, claves, ruta=None):
+    """
+    Guarda en 'stock.json' los cambios de algunos productos sin pisar lo que otros
+    procesos hayan guardado mientras tanto.
+
+    Con el archivo bloqueado, si alguien más lo escribió desde la última vez que
+    este proceso lo guardó, se vuelve a leer: se le aplican los productos indicados
+    (o su eliminación, si ya no están en `stock`) y el resto de `stock` se actualiza
+    con lo que había en el archivo. Si nadie más lo escribió, se guarda directamente.
+    Si dos procesos cambian el mismo producto, queda el último que guardó.
+
+    Args:
+        stock (dict): Diccionario con los productos del inventario. Se actualiza en el lugar.
+        claves (list): Claves de los productos agregados, modificados o eliminados.
+        ruta (str, opcional): Archivo a escribir. Por defecto, RUTA_JSON.
+
+    Retorna:
+        list: Claves que se actualizaron en `stock` con lo que había en el archivo.
+
+    Excepciones:
+        Puede lanzar IOError si ocurre un error al escribir el archivo.
+    """
+    ruta = ruta or RUTA_JSON
+    actualizadas = []
+    with bloquear(ruta) as bloqueo:
+        bloqueo.seek(0)
+        escrituras = int(bloqueo.read() or 0)
+
+        if escrituras != _escrituras_vistas.get(ruta):
+            guardado = leer_json(ruta)
+            for clave in claves:
+                if clave in stock:
+                    guardado[clave] = stock[clave]
+                else:
+                    guardado.pop(clave, None)
+            actualizadas = [
+                clave for clave in guardado.keys() | stock.keys()
+                if guardado.get(clave) != stock.get(clave)
+            ]
+            for clave in actualizadas:
+                if clave in guardado:
+                    stock[clave] = guardado[clave]
+                else:
+                    del stock[clave]
+
+        guardar_json(stock, ruta)
+        bloqueo.seek(0)
+        bloqueo.truncate()
+        bloqueo.write(str(escrituras + 1).encode())
+        bloqueo.flush()
+        _escrituras_vistas[ruta] = escrituras + 1
+    return actualizadas
+
+def migrar_stock_json():
+    """
+    Migra las fechas del archivo 'stock.json' al formato interno 'AAAA-MM-DD'
+    y guarda el resultado. La forma en que se muestran las fechas no cambia.
+
+    Retorna:
+        int: Cantidad de fechas convertidas. Si es 0, el archivo no se reescribe.
+
+    Excepciones:
+        Puede lanzar IOError si ocurre un error al escribir el archivo.
+    """
+    if not os.path.exists(RUTA_JSON):
+        return 0
+
+    with open(RUTA_JSON, "r", encoding="utf-8") as archivo:
+        stock = json.load(archivo)
+
+    convertidas = migrar_fechas(stock)
+    if convertidas:
+        guardar_json(stock)
+        registrar_en_log(f"📅 Se migraron {convertidas} fechas al formato AAAA-MM-DD.")
+    return convertidas
+
+def registrar_cambio(clave, producto, eliminado=False, ruta=None, motivo=None):
+    """
+    Marca un producto como modificado y agrega el cambio al registro de cambios ('cambios.jsonl').
+
+    Al producto se le incrementa 'version' y se le asigna 'modificado' con la fecha
+    y hora actual. Si el producto fue eliminado, se registra una lápida (producto
+    nulo) para que la eliminación también se sincronice. Un motivo (por ejemplo
+    'transferencia') se guarda en la entrada para distinguir los movimientos que no
+    son consumo.
+
+    Args:
+        clave (str): Clave del producto modificado.
+        producto (dict): Datos del producto. Si fue eliminado, los últimos datos que tenía.
+        eliminado (bool): Indica si el producto se eliminó del inventario.
+        ruta (str, opcional): Registro de cambios a usar. Por defecto, RUTA_CAMBIOS.
+        motivo (str, opcional): Motivo del cambio, si no es una edición del usuario.
+
+    Retorna:
+        dict: La entrada agregada al registro de cambios.
+
+    Excepciones:
+        IOError: Si ocurre un error al intentar escribir en el archivo.
+    """
+    producto["version"] = producto.get("version", 0) + 1
+    producto["modificado"] = datetime.now().isoformat(timespec="microseconds")
+
+    entrada = {
+        "clave": clave,
+        "version": producto["version"],
+        "modificado": producto["modificado"],
+        "producto": None if eliminado else producto,
+    }
+    if motivo:
+        entrada["motivo"] = motivo
+    agregar_cambios([entrada], ruta)
+    return entrada
+
+def agregar_cambios(entradas, ruta=None):
+    """
+    Agrega entradas al final del registro de cambios, una por línea en formato JSON.
+
+    Args:
+        entradas (list): Entradas a agregar.
+        ruta (str, opcional): Registro de cambios a usar. Por defecto, RUTA_CAMBIOS.
+
+    Retorna:
+        None
+    """
+    ruta = ruta or RUTA_CAMBIOS
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    with open(ruta, "a", encoding="utf-8") as archivo:
+        for entrada in entradas:
+            archivo.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+
+def leer_cambios_desde(ruta, posicion):
+    """
+    Lee las entradas del registro de cambios a partir de una posición en bytes.
+
+    Solo se recorre lo agregado desde esa posición, por lo que el costo depende de
+    la cantidad de cambios nuevos y no del tamaño del catálogo. Una última línea
+    incompleta (escritura a medias) se ignora y queda para la próxima lectura; una
+    línea completa que no es JSON válido se saltea.
+
+    Args:
+        ruta (str): Archivo 'cambios.jsonl'.
+        posicion (int): Posición en bytes desde donde leer.
+
+    Retorna:
+        tuple: Una tupla con dos elementos:
+            - list: Entradas leídas, en orden.
+            - int: Posición final hasta donde se leyó.
+    """
+    if not os.path.exists(ruta):
+        return [], 0
+
+    entradas = []
+    with open(ruta, "rb") as archivo:
+        archivo.seek(posicion)
+        for linea in archivo:
+            if not linea.endswith(b"\n"):
+                break
+            posicion += len(linea)
+            try:
+                entrada = json.loads(linea)
+            except json.JSONDecodeError:
+                continue  # Línea dañada
+            if isinstance(entrada, dict) and "clave" in entrada:
+                entradas.append(entrada)
+    return entradas, posicion
+
+def registrar_en_log(mensaje, ruta=None):
     """
     Registra un mensaje en el archivo de log con la fecha y hora actual (dd/mm/aaaa hh:mm:ss).
 
     Args:
         mensaje (str): Texto que se desea registrar en el archivo de log.
+        ruta (str, opcional): Archivo de log a usar. Por defecto, RUTA_LOG.
 
     Retorna:
         None
@@ -66,9 +283,10 @@ def registrar_en_log(mensaje):
     #Se formatea la fecha y arma la línea para guardar.
     fecha = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
     linea = f"[{fecha}] {mensaje}\n"
+    ruta = ruta or RUTA_LOG
     #Asegura que exista la carpeta donde se guarda el log
-    os.makedirs(os.path.dirname(RUTA_LOG), exist_ok=True)
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
     #Se abre el archivo en modo "append" para no sobrescribir, y se escribe el log
-    with open(RUTA_LOG, "a", encoding="utf-8") as archivo:
+    with open(ruta, "a", encoding="utf-8") as archivo:
         archivo.write(linea)
         
\ No newline at end of file
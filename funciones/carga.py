@@ -0,0 +1,445 @@
+import io
+import json
+import math
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from funciones import archivos, helpers, menu, stock as flujos
+
+#Proporción de cada flujo en una prueba de carga
+MEZCLA = {"buscar": 40, "agregar": 25, "editar": 25, "eliminar": 10}
+PERCENTILES = (50, 90, 99)
+
+#Texto que cada mutación deja en el log
+MARCAS_LOG = {"agregar": "🆕", "sumar": "➕", "editar": "✏️", "eliminar": "🗑"}
+
+
+class _Pregunta:
+    """
+    Pregunta pendiente de un `Guion`: se responde al llamar a `ask()`, igual que en `questionary`.
+    """
+    def __init__(self, guion, tipo, mensaje, opciones=None):
+        self.guion = guion
+        self.tipo = tipo
+        self.mensaje = mensaje
+        self.opciones = opciones
+
+    def ask(self):
+        return self.guion.responder(self.tipo, self.mensaje, self.opciones)
+
+
+class Guion:
+    """
+    Reemplazo de `questionary` que contesta con respuestas preparadas de antemano.
+
+    Las respuestas pueden ser valores sueltos o entradas de una sesión grabada
+    ({'tipo', 'mensaje', 'respuesta'}). En modo estricto, una entrada grabada
+    debe corresponder exactamente a la pregunta que se hace. Los errores se
+    informan con RuntimeError y no con ValueError, porque los flujos usan
+    ValueError para volver a preguntar y el guion quedaría en un bucle.
+    """
+    def __init__(self, respuestas=(), estricto=False):
+        self.respuestas = deque(respuestas)
+        self.estricto = estricto
+
+    def text(self, mensaje, **kwargs):
+        return _Pregunta(self, "text", mensaje)
+
+    def select(self, mensaje, choices=None, **kwargs):
+        return _Pregunta(self, "select", mensaje, choices)
+
+    def confirm(self, mensaje, **kwargs):
+        return _Pregunta(self, "confirm", mensaje)
+
+    def responder(self, tipo, mensaje, opciones):
+        if not self.respuestas:
+            raise RuntimeError(f"No quedan respuestas para la pregunta: '{mensaje}'.")
+
+        respuesta = self.respuestas.popleft()
+        if isinstance(respuesta, dict):
+            if self.estricto and (respuesta["tipo"], respuesta["mensaje"]) != (tipo, mensaje):
+                raise RuntimeError(f"La sesión grabada esperaba '{respuesta['mensaje']}' y se preguntó '{mensaje}'.")
+            respuesta = respuesta["respuesta"]
+
+        if opciones is not None and respuesta not in opciones:
+            raise RuntimeError(f"La respuesta '{respuesta}' no es una opción de '{mensaje}'.")
+        return respuesta
+
+
+class _PreguntaGrabada:
+    def __init__(self, grabadora, tipo, mensaje, pregunta):
+        self.grabadora = grabadora
+        self.tipo = tipo
+        self.mensaje = mensaje
+        self.pregunta = pregunta
+
+    def ask(self):
+        respuesta = self.pregunta.ask()
+        self.grabadora.anotar(self.tipo, self.mensaje, respuesta)
+        return respuesta
+
+
+class Grabadora:
+    """
+    Envoltorio de `questionary` que hace las preguntas normalmente y anota cada
+    respuesta en un archivo JSONL, para reproducir la sesión después con un `Guion`.
+    """
+    def __init__(self, modulo, archivo):
+        self.modulo = modulo
+        self.archivo = archivo
+
+    def text(self, mensaje, **kwargs):
+        return _PreguntaGrabada(self, "text", mensaje, self.modulo.text(mensaje, **kwargs))
+
+    def select(self, mensaje, **kwargs):
+        return _PreguntaGrabada(self, "select", mensaje, self.modulo.select(mensaje, **kwargs))
+
+    def confirm(self, mensaje, **kwargs):
+        return _PreguntaGrabada(self, "confirm", mensaje, self.modulo.confirm(mensaje, **kwargs))
+
+    def anotar(self, tipo, mensaje, respuesta):
+        entrada = {"tipo": tipo, "mensaje": mensaje, "respuesta": respuesta}
+        self.archivo.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+        self.archivo.flush()
+
+
+@contextmanager
+def reemplazar_questionary(falso):
+    """
+    Reemplaza `questionary` en los módulos con menús mientras dura el bloque `with`.
+
+    Args:
+        falso: Objeto con los métodos `text`, `select` y `confirm` (por ejemplo, un `Guion`).
+    """
+    modulos = (flujos, helpers, menu)
+    originales = [modulo.questionary for modulo in modulos]
+    for modulo in modulos:
+        modulo.questionary = falso
+    try:
+        yield falso
+    finally:
+        for modulo, original in zip(modulos, originales):
+            modulo.questionary = original
+
+
+@contextmanager
+def grabar_sesion(ruta):
+    """
+    Graba en un archivo JSONL las respuestas dadas a los menús dentro del bloque `with`.
+
+    Args:
+        ruta (str): Archivo donde se guarda la sesión.
+    """
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        with reemplazar_questionary(Grabadora(flujos.questionary, archivo)) as grabadora:
+            yield grabadora
+
+
+def leer_sesion(ruta):
+    """
+    Lee una sesión grabada con `grabar_sesion`.
+
+    Args:
+        ruta (str): Archivo de la sesión.
+
+    Returns:
+        list: Entradas {'tipo', 'mensaje', 'respuesta'} en orden.
+    """
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        return [json.loads(linea) for linea in archivo if linea.strip()]
+
+
+def usar_directorio(directorio):
+    """
+    Hace que el stock, el log y el registro de cambios se lean y escriban en otro directorio.
+
+    Args:
+        directorio (str): Directorio de datos a usar.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    archivos.RUTA_JSON = os.path.join(directorio, "stock.json")
+    archivos.RUTA_LOG = os.path.join(directorio, "registro.log")
+    archivos.RUTA_CAMBIOS = os.path.join(directorio, "cambios.jsonl")
+
+
+def generar_inventario(cantidad, semilla=0):
+    """
+    Genera un inventario sintético con nombres únicos.
+
+    Args:
+        cantidad (int): Cantidad de productos.
+        semilla (int): Semilla para que el inventario sea reproducible.
+
+    Returns:
+        dict: Inventario con el mismo formato que 'stock.json'.
+    """
+    rng = random.Random(semilla)
+    categorias = ["Alimentos", "Productos de limpieza", "Bebidas y lácteos", "Otros"]
+    stock = {}
+    for i in range(cantidad):
+        nombre = f"prod-{i:07d}"
+        marca = f"marca{rng.randrange(50)}"
+        presentacion = rng.choice(["500ml", "1l", "200gr", "1kg", "pack x 6"])
+        cantidad_inicial = rng.randrange(10, 200)
+        stock[f"{nombre}({marca}) - {presentacion}"] = {
+            "nombre": nombre,
+            "marca": marca,
+            "presentacion": presentacion,
+            "cantidad": cantidad_inicial,
+            "precio": float(rng.randrange(100, 5000)),
+            "stock_minimo": rng.randrange(0, 10),
+            "vencimiento": f"20{rng.randrange(26, 31)}-{rng.randrange(1, 13):02d}-15",
+            "fecha_ingreso": "2024-01-01",
+            "categoria": rng.choice(categorias),
+        }
+    return stock
+
+
+def _seleccion(stock, clave):
+    """
+    Respuestas para elegir un producto con `seleccionar_producto_por_nombre`: el
+    nombre y, si hay varias coincidencias, la clave en el menú.
+    """
+    termino = stock[clave]["nombre"].lower()
+    coincidencias = sum(1 for datos in stock.values() if termino in datos["nombre"].lower())
+    return [termino, clave] if coincidencias > 1 else [termino]
+
+
+def _preparar_flujo(flujo, stock, esperado, rng, numero):
+    """
+    Arma las respuestas de un flujo y aplica al modelo esperado el efecto que debería tener.
+
+    Returns:
+        tuple: (función del flujo, respuestas, marca esperada en el log o None).
+    """
+    if flujo == "agregar":
+        #La mitad de las veces se reingresa un producto existente escrito distinto
+        if stock and rng.random() < 0.5:
+            clave = rng.choice(list(esperado))
+            producto = stock[clave]
+            cantidad = rng.randrange(1, 20)
+            presentacion = {"1l": "1000 ML", "1kg": "1000 g", "200gr": "200 G"}.get(
+                producto["presentacion"], producto["presentacion"].upper()
+            )
+            respuestas = [
+                producto["nombre"].upper(), f"  {producto['marca'].upper()} ", presentacion,
+                str(cantidad), str(producto["precio"]), "0", "01012024", "01012030", "Otros",
+            ]
+            esperado[clave] += cantidad
+            return flujos.agregar_insumos, respuestas, MARCAS_LOG["sumar"]
+
+        nombre = f"nuevo-{os.getpid()}-{numero:07d}"
+        cantidad = rng.randrange(1, 100)
+        respuestas = [nombre, "generica", "1kg", str(cantidad), "100", "0", "01012024", "01012030", "Otros"]
+        esperado[f"{nombre}(generica) - 1kg"] = cantidad
+        return flujos.agregar_insumos, respuestas, MARCAS_LOG["agregar"]
+
+    if not stock:
+        return None, [], None
+
+    clave = rng.choice(list(esperado))
+    if flujo == "buscar":
+        return flujos.buscar_producto, _seleccion(stock, clave), None
+
+    if flujo == "editar":
+        cantidad = float(rng.randrange(0, 300))
+        esperado[clave] = cantidad
+        return flujos.editar_producto, _seleccion(stock, clave) + ["Cantidad", str(cantidad)], MARCAS_LOG["editar"]
+
+    del esperado[clave]
+    return flujos.eliminar_producto, _seleccion(stock, clave) + [True], MARCAS_LOG["eliminar"]
+
+
+def percentil(valores, porcentaje):
+    """
+    Devuelve el percentil de una lista de valores (método del rango más cercano).
+
+    Args:
+        valores (list): Valores ya ordenados.
+        porcentaje (float): Percentil buscado, entre 0 y 100.
+
+    Returns:
+        float: Valor del percentil, o 0 si la lista está vacía.
+    """
+    if not valores:
+        return 0.0
+    indice = max(0, min(len(valores) - 1, math.ceil(porcentaje / 100 * len(valores)) - 1))
+    return valores[indice]
+
+
+def verificar_invariantes(directorio, esperado, marcas):
+    """
+    Verifica el estado de un directorio de datos luego de una prueba de carga.
+
+    Se comprueba que 'stock.json' sea válido y tenga exactamente las cantidades
+    esperadas (ninguna actualización perdida), que el log tenga una entrada por
+    cada mutación y que el registro de cambios tenga una entrada por mutación.
+
+    Args:
+        directorio (str): Directorio de datos.
+        esperado (dict): Cantidad esperada por clave.
+        marcas (dict): Cantidad de entradas esperadas en el log por cada marca.
+
+    Returns:
+        list: Descripción de cada invariante que no se cumple. Vacía si está todo bien.
+    """
+    errores = []
+    try:
+        with open(os.path.join(directorio, "stock.json"), "r", encoding="utf-8") as archivo:
+            stock = json.load(archivo)
+    except (OSError, json.JSONDecodeError) as error:
+        return [f"stock.json no es válido: {error}"]
+
+    faltantes = esperado.keys() - stock.keys()
+    sobrantes = stock.keys() - esperado.keys()
+    if faltantes:
+        errores.append(f"Faltan {len(faltantes)} productos en stock.json (ej: '{next(iter(faltantes))}').")
+    if sobrantes:
+        errores.append(f"Sobran {len(sobrantes)} productos en stock.json (ej: '{next(iter(sobrantes))}').")
+    distintos = [clave for clave in esperado.keys() & stock.keys() if stock[clave]["cantidad"] != esperado[clave]]
+    if distintos:
+        errores.append(f"{len(distintos)} productos con cantidad distinta a la esperada (ej: '{distintos[0]}').")
+
+    ruta_log = os.path.join(directorio, "registro.log")
+    lineas = []
+    if os.path.exists(ruta_log):
+        with open(ruta_log, "r", encoding="utf-8") as archivo:
+            lineas = archivo.readlines()
+    for marca, cantidad in marcas.items():
+        encontradas = sum(1 for linea in lineas if marca in linea)
+        if encontradas != cantidad:
+            errores.append(f"El log tiene {encontradas} entradas '{marca}' y se esperaban {cantidad}.")
+
+    ruta_cambios = os.path.join(directorio, "cambios.jsonl")
+    cambios = 0
+    if os.path.exists(ruta_cambios):
+        with open(ruta_cambios, "rb") as archivo:
+            cambios = sum(1 for _ in archivo)
+    if cambios != sum(marcas.values()):
+        errores.append(f"El registro de cambios tiene {cambios} entradas y se esperaban {sum(marcas.values())}.")
+
+    return errores
+
+
+def ejecutar_trabajador(parametros):
+    """
+    Ejecuta una serie de flujos al azar sobre un inventario sintético y devuelve lo
+    que debería haber quedado guardado. Está definida a nivel de módulo para poder
+    ejecutarse en otro proceso.
+
+    Sin partición, el trabajador genera su propio inventario en el directorio. Con
+    una partición (i, procesos), lee el inventario ya generado en un directorio
+    compartido y solo modifica los productos cuyo número de orden da resto i al
+    dividirlo por la cantidad de procesos.
+
+    Args:
+        parametros (tuple): (directorio, operaciones, productos, semilla, particion).
+
+    Returns:
+        dict: {'latencias': {flujo: [segundos]}, 'esperado': {clave: cantidad},
+        'marcas': {marca: cantidad}}.
+    """
+    directorio, operaciones, productos, semilla, particion = parametros
+    usar_directorio(directorio)
+    rng = random.Random(semilla)
+
+    if particion is None:
+        stock = generar_inventario(productos, semilla)
+        archivos.guardar_json(stock)
+        esperado = {clave: producto["cantidad"] for clave, producto in stock.items()}
+    else:
+        indice, procesos = particion
+        stock = archivos.leer_json()
+        esperado = {
+            clave: producto["cantidad"] for numero, (clave, producto) in enumerate(stock.items())
+            if numero % procesos == indice
+        }
+    marcas = {marca: 0 for marca in MARCAS_LOG.values()}
+    latencias = {flujo: [] for flujo in MEZCLA}
+    nombres, pesos = list(MEZCLA), list(MEZCLA.values())
+
+    for numero in range(operaciones):
+        flujo = rng.choices(nombres, pesos)[0]
+        funcion, respuestas, marca = _preparar_flujo(flujo, stock, esperado, rng, numero)
+        if funcion is None:
+            continue
+
+        with reemplazar_questionary(Guion(respuestas)), redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            resultado = funcion(stock)
+            latencias[flujo].append(time.perf_counter() - inicio)
+
+        if resultado is not None:
+            stock = resultado
+        if marca:
+            marcas[marca] += 1
+
+    return {"latencias": latencias, "esperado": esperado, "marcas": marcas}
+
+
+def ejecutar_carga(directorio, operaciones=1000, productos=1000, procesos=1, semilla=0, compartido=False):
+    """
+    Ejecuta una prueba de carga de los flujos de agregar, editar, eliminar y buscar.
+
+    Por defecto cada proceso trabaja sobre su propio inventario sintético en un
+    subdirectorio. Con `compartido`, todos los procesos trabajan sobre el mismo
+    'stock.json', cada uno con productos distintos, y los invariantes verifican
+    que ningún proceso pise las actualizaciones de los demás.
+
+    Args:
+        directorio (str): Directorio donde se crean los datos de la prueba.
+        operaciones (int): Cantidad de flujos a ejecutar por proceso.
+        productos (int): Tamaño del inventario sintético inicial.
+        procesos (int): Cantidad de procesos en paralelo.
+        semilla (int): Semilla para que la prueba sea reproducible.
+        compartido (bool): Usar un mismo directorio de datos para todos los procesos.
+
+    Returns:
+        dict: {'percentiles': {flujo: {'cantidad', 'p50', 'p90', 'p99', 'max'}}, 'errores': [str]},
+        con las latencias en milisegundos.
+    """
+    if compartido:
+        #El inventario se genera una sola vez y cada proceso lo lee al empezar
+        usar_directorio(directorio)
+        archivos.guardar_json(generar_inventario(productos, semilla))
+        parametros = [
+            (directorio, operaciones, productos, semilla + i, (i, procesos)) for i in range(procesos)
+        ]
+    else:
+        parametros = [
+            (os.path.join(directorio, f"proceso_{i}"), operaciones, productos, semilla + i, None)
+            for i in range(procesos)
+        ]
+
+    if procesos == 1:
+        resultados = [ejecutar_trabajador(parametros[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = list(pool.map(ejecutar_trabajador, parametros))
+
+    percentiles = {}
+    for flujo in MEZCLA:
+        valores = sorted(v * 1000 for r in resultados for v in r["latencias"][flujo])
+        percentiles[flujo] = {"cantidad": len(valores), "max": valores[-1] if valores else 0.0}
+        for porcentaje in PERCENTILES:
+            percentiles[flujo][f"p{porcentaje}"] = percentil(valores, porcentaje)
+
+    if compartido:
+        #Los productos de cada proceso son distintos, así que lo esperado se puede unir
+        esperado = {}
+        marcas = {marca: 0 for marca in MARCAS_LOG.values()}
+        for resultado in resultados:
+            esperado.update(resultado["esperado"])
+            for marca, cantidad in resultado["marcas"].items():
+                marcas[marca] += cantidad
+        errores = verificar_invariantes(directorio, esperado, marcas)
+    else:
+        errores = [
+            f"proceso_{i}: {error}"
+            for i, resultado in enumerate(resultados)
+            for error in verificar_invariantes(parametros[i][0], resultado["esperado"], resultado["marcas"])
+        ]
+    return {"percentiles": percentiles, "errores": errores}
@@ -0,0 +1,251 @@
+import csv
+import gzip
+import json
+import math
+import os
+import re
+import zipfile
+from itertools import islice
+from xml.sax.saxutils import escape
+from funciones.fechas import hoy_iso, es_fecha_iso
+from funciones.identidad import normalizar_texto
+
+FORMATOS = ("csv", "jsonl", "xlsx")
+TAMANIO_BLOQUE = 1000
+#gzip rápido: a nivel 9 la compresión tarda más que escribir el archivo
+NIVEL_GZIP = 1
+#Filas que admite una hoja de Excel, contando el encabezado
+MAX_FILAS_XLSX = 1048576
+COLUMNAS = [
+    "almacen", "clave", "nombre", "marca", "presentacion", "categoria",
+    "cantidad", "stock_minimo", "precio", "fecha_ingreso", "vencimiento",
+]
+
+#Caracteres que XML 1.0 no admite en un documento, ni siquiera escapados
+_XML_INVALIDOS = re.compile("[^\x09\x0A\x0D\x20-\uD7FF\uE000-\uFFFD\U00010000-\U0010FFFF]")
+
+#Partes fijas de un archivo .xlsx con una sola hoja
+_XLSX_TIPOS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_LIBRO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Stock" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_LIBRO_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def filtrar_productos(inventario, categoria=None, vence_en=None, bajo_stock=False):
+    """
+    Recorre el inventario de uno o varios almacenes y va devolviendo las filas que
+    cumplen los filtros, sin armar una lista intermedia.
+
+    Args:
+        inventario (dict): Inventario de la forma {almacen: {clave: producto}}.
+        categoria (str, opcional): Solo productos de esta categoría (sin distinguir mayúsculas ni tildes).
+        vence_en (int, opcional): Solo productos vencidos o que vencen dentro de esta cantidad de días.
+        bajo_stock (bool): Solo productos con cantidad igual o menor al stock mínimo.
+
+    Yields:
+        dict: Fila con las columnas de `COLUMNAS`.
+    """
+    categoria = normalizar_texto(categoria) if categoria else None
+    limite = hoy_iso(vence_en) if vence_en is not None else None
+
+    for almacen, stock in inventario.items():
+        for clave, producto in stock.items():
+            if categoria and normalizar_texto(producto.get("categoria")) != categoria:
+                continue
+
+            if limite is not None:
+                vencimiento = producto.get("vencimiento")
+                if not es_fecha_iso(vencimiento) or vencimiento > limite:
+                    continue
+
+            if bajo_stock:
+                try:
+                    if producto["cantidad"] > producto["stock_minimo"]:
+                        continue
+                except (KeyError, TypeError):
+                    continue
+
+            fila = {columna: producto.get(columna, "") for columna in COLUMNAS}
+            fila["almacen"] = almacen
+            fila["clave"] = clave
+            yield fila
+
+
+def en_bloques(filas, tamanio=TAMANIO_BLOQUE):
+    """
+    Agrupa las filas en listas de tamaño fijo, consumiendo el iterable de a un bloque por vez.
+
+    Args:
+        filas (iterable): Filas a agrupar.
+        tamanio (int): Cantidad de filas por bloque.
+
+    Yields:
+        list: Bloque de hasta `tamanio` filas.
+    """
+    filas = iter(filas)
+    while True:
+        bloque = list(islice(filas, tamanio))
+        if not bloque:
+            return
+        yield bloque
+
+
+def _abrir_texto(ruta, comprimir):
+    """
+    Abre un archivo de texto para escritura, comprimido con gzip si se pide.
+    """
+    if comprimir:
+        return gzip.open(ruta, "wt", compresslevel=NIVEL_GZIP, encoding="utf-8", newline="")
+    return open(ruta, "w", encoding="utf-8", newline="")
+
+
+def _exportar_csv(filas, ruta, comprimir):
+    total = 0
+    with _abrir_texto(ruta, comprimir) as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=COLUMNAS)
+        escritor.writeheader()
+        for bloque in en_bloques(filas):
+            escritor.writerows(bloque)
+            total += len(bloque)
+    return total
+
+
+def _exportar_jsonl(filas, ruta, comprimir):
+    total = 0
+    with _abrir_texto(ruta, comprimir) as archivo:
+        for bloque in en_bloques(filas):
+            archivo.write("".join(json.dumps(fila, ensure_ascii=False) + "\n" for fila in bloque))
+            total += len(bloque)
+    return total
+
+
+def _celda_xlsx(valor):
+    """
+    Arma una celda de la hoja: los números finitos se guardan como números y el
+    resto como texto, sin los caracteres de control que XML no admite.
+    """
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool) and math.isfinite(valor):
+        return f"<c><v>{valor}</v></c>"
+    texto = _XML_INVALIDOS.sub("", str(valor))
+    return f'<c t="inlineStr"><is><t>{escape(texto)}</t></is></c>'
+
+
+def _fila_xlsx(valores):
+    return "<row>" + "".join(_celda_xlsx(valor) for valor in valores) + "</row>"
+
+
+def _exportar_xlsx(filas, ruta):
+    try:
+        return _escribir_xlsx(filas, ruta)
+    except ValueError:
+        #No se deja un libro a medio escribir
+        os.remove(ruta)
+        raise
+
+
+def _escribir_xlsx(filas, ruta):
+    total = 0
+    with zipfile.ZipFile(ruta, "w", compression=zipfile.ZIP_DEFLATED) as libro:
+        libro.writestr("[Content_Types].xml", _XLSX_TIPOS)
+        libro.writestr("_rels/.rels", _XLSX_RELS)
+        libro.writestr("xl/workbook.xml", _XLSX_LIBRO)
+        libro.writestr("xl/_rels/workbook.xml.rels", _XLSX_LIBRO_RELS)
+
+        #La hoja se escribe en streaming dentro del zip, de a un bloque por vez
+        with libro.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as hoja:
+            hoja.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            hoja.write(_fila_xlsx(COLUMNAS).encode("utf-8"))
+            for bloque in en_bloques(filas):
+                if total + len(bloque) + 1 > MAX_FILAS_XLSX:
+                    raise ValueError(
+                        f"El formato XLSX admite hasta {MAX_FILAS_XLSX - 1} productos por hoja; "
+                        "filtrá la exportación o usá CSV o JSONL."
+                    )
+                texto = "".join(_fila_xlsx(fila[columna] for columna in COLUMNAS) for fila in bloque)
+                hoja.write(texto.encode("utf-8"))
+                total += len(bloque)
+            hoja.write(b"</sheetData></worksheet>")
+    return total
+
+
+def formato_de_ruta(ruta):
+    """
+    Deduce el formato de exportación a partir de la extensión del archivo,
+    ignorando un '.gz' final.
+
+    Args:
+        ruta (str): Archivo de salida.
+
+    Returns:
+        str: 'csv', 'jsonl' o 'xlsx'. Si la extensión no es ninguna de esas, 'csv'.
+    """
+    if ruta.endswith(".gz"):
+        ruta = ruta[:-3]
+    extension = os.path.splitext(ruta)[1].lower().lstrip(".")
+    return extension if extension in FORMATOS else "csv"
+
+
+def exportar(inventario, ruta, formato=None, comprimir=None, categoria=None, vence_en=None, bajo_stock=False):
+    """
+    Exporta el inventario a un archivo CSV, JSONL o XLSX, escribiéndolo en bloques
+    de tamaño fijo para no armar nunca la salida completa en memoria.
+
+    Args:
+        inventario (dict): Inventario de la forma {almacen: {clave: producto}}.
+        ruta (str): Archivo de salida.
+        formato (str, opcional): 'csv', 'jsonl' o 'xlsx'. Por defecto, según la extensión de la ruta.
+        comprimir (bool, opcional): Comprimir con gzip. Por defecto, si la ruta termina en '.gz'.
+        categoria (str, opcional): Solo productos de esta categoría.
+        vence_en (int, opcional): Solo productos vencidos o que vencen dentro de esta cantidad de días.
+        bajo_stock (bool): Solo productos con cantidad igual o menor al stock mínimo.
+
+    Returns:
+        int: Cantidad de productos exportados.
+
+    Excepciones:
+        ValueError: Si el formato no es válido, se pide gzip para XLSX (que ya es un zip)
+        o los productos no entran en una hoja XLSX.
+    """
+    if formato is None:
+        formato = formato_de_ruta(ruta)
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: '{formato}'. Opciones: {', '.join(FORMATOS)}.")
+    if comprimir is None:
+        comprimir = ruta.endswith(".gz")
+    if formato == "xlsx" and comprimir:
+        raise ValueError("El formato XLSX ya está comprimido; no se puede usar gzip.")
+
+    filas = filtrar_productos(inventario, categoria, vence_en, bajo_stock)
+
+    if formato == "csv":
+        return _exportar_csv(filas, ruta, comprimir)
+    if formato == "jsonl":
+        return _exportar_jsonl(filas, ruta, comprimir)
+    return _exportar_xlsx(filas, ruta)
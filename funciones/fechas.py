@@ -0,0 +1,159 @@
+from datetime import date, timedelta
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def parsear_fecha(fecha_str):
+    """
+    Convierte una fecha en texto a su ordinal entero (días desde el 01/01/0001).
+
+    Es el único punto de parseo de fechas del sistema. Acepta las formas en que
+    el usuario ingresa fechas ('DDMMAAAA' y 'DD/MM/AAAA') y además el formato
+    interno 'AAAA-MM-DD'. Los resultados se memorizan, por lo que parsear
+    repetidamente la misma fecha no vuelve a recorrer el texto.
+
+    Args:
+        fecha_str (str): Fecha en formato 'DDMMAAAA', 'DD/MM/AAAA' o 'AAAA-MM-DD'.
+
+    Returns:
+        int: Ordinal de la fecha, apto para comparar con `<`, `>` o restar días.
+
+    Raises:
+        TypeError: Si el argumento no es una cadena.
+        ValueError: Si el texto no corresponde a una fecha válida.
+    """
+    #Se verifica que el dato sea texto
+    if not isinstance(fecha_str, str):
+        raise TypeError("La fecha debe ser una cadena de texto.")
+
+    texto = fecha_str.strip()
+    #Formato interno AAAA-MM-DD
+    if len(texto) == 10 and texto[4] == "-" and texto[7] == "-":
+        return date.fromisoformat(texto).toordinal()
+    #Formato DDMMAAAA, se lleva a DD/MM/AAAA
+    if len(texto) == 8 and texto.isdigit():
+        texto = f"{texto[:2]}/{texto[2:4]}/{texto[4:]}"
+    #Formato DD/MM/AAAA
+    partes = texto.split("/")
+    if len(partes) != 3 or not all(p.isdigit() for p in partes) or len(partes[2]) != 4:
+        raise ValueError(f"Fecha inválida: '{fecha_str}'.")
+    dia, mes, anio = (int(p) for p in partes)
+    return date(anio, mes, dia).toordinal()
+
+
+def fecha_iso(fecha_str):
+    """
+    Normaliza una fecha al formato interno de almacenamiento 'AAAA-MM-DD'.
+
+    Args:
+        fecha_str (str): Fecha en cualquiera de las formas aceptadas por `parsear_fecha`.
+
+    Returns:
+        str: La fecha en formato 'AAAA-MM-DD'.
+
+    Raises:
+        TypeError: Si el argumento no es una cadena.
+        ValueError: Si el texto no corresponde a una fecha válida.
+    """
+    return date.fromordinal(parsear_fecha(fecha_str)).isoformat()
+
+
+@lru_cache(maxsize=4096)
+def fecha_legible(fecha_str):
+    """
+    Da formato 'DD/MM/AAAA' a una fecha guardada internamente, para mostrarla al usuario.
+
+    Si el valor no es una fecha válida, se devuelve tal como está, para no
+    ocultar datos mal cargados.
+
+    Args:
+        fecha_str (str): Fecha en cualquiera de las formas aceptadas por `parsear_fecha`.
+
+    Returns:
+        str: Fecha en formato 'DD/MM/AAAA' o el valor original si no es válida.
+    """
+    try:
+        return date.fromordinal(parsear_fecha(fecha_str)).strftime("%d/%m/%Y")
+    except (TypeError, ValueError):
+        return fecha_str
+
+
+def hoy():
+    """
+    Devuelve la fecha actual como ordinal entero.
+
+    Returns:
+        int: Ordinal de la fecha de hoy.
+    """
+    return date.today().toordinal()
+
+
+def hoy_iso(dias=0):
+    """
+    Devuelve la fecha actual, desplazada en la cantidad de días indicada, en el formato
+    interno 'AAAA-MM-DD'. Las fechas guardadas se comparan directamente contra este
+    texto, porque en ese formato el orden alfabético coincide con el cronológico.
+
+    Args:
+        dias (int): Días a sumar a la fecha actual (por defecto: 0).
+
+    Returns:
+        str: Fecha en formato 'AAAA-MM-DD'.
+    """
+    return (date.today() + timedelta(days=dias)).isoformat()
+
+
+def es_fecha_iso(valor):
+    """
+    Indica si un valor guardado es una fecha válida en el formato interno 'AAAA-MM-DD'.
+
+    Los valores que `migrar_fechas` no pudo convertir quedan como estaban, incluso
+    los que tienen la forma pero no son una fecha (como '2025-13-40'). Por eso se
+    valida la fecha y no solo la forma; el resultado se memoriza, así que en los
+    recorridos del inventario cuesta una búsqueda por producto.
+
+    Args:
+        valor: Valor a revisar.
+
+    Returns:
+        bool: True si es una fecha válida en formato 'AAAA-MM-DD'.
+    """
+    return isinstance(valor, str) and _es_fecha_iso_valida(valor)
+
+
+@lru_cache(maxsize=4096)
+def _es_fecha_iso_valida(texto):
+    if len(texto) != 10 or texto[4] != "-" or texto[7] != "-":
+        return False
+    try:
+        date.fromisoformat(texto)
+    except ValueError:
+        return False
+    return True
+
+
+def migrar_fechas(stock):
+    """
+    Convierte al formato interno 'AAAA-MM-DD' las fechas de ingreso y vencimiento
+    de todos los productos del inventario.
+
+    Los valores que no se pueden interpretar como fecha se dejan sin cambios.
+
+    Args:
+        stock (dict): Diccionario con los productos del inventario. Se modifica en el lugar.
+
+    Returns:
+        int: Cantidad de fechas convertidas.
+    """
+    convertidas = 0
+    for producto in stock.values():
+        for campo in ("fecha_ingreso", "vencimiento"):
+            valor = producto.get(campo)
+            try:
+                nuevo = fecha_iso(valor)
+            except (TypeError, ValueError):
+                continue
+            if nuevo != valor:
+                producto[campo] = nuevo
+                convertidas += 1
+    return convertidas
@@ -43,32 +43,3 @@ def seleccionar_producto_por_nombre(stock, accion="ver"):
     ).ask()
 
     return None if seleccion == "Cancelar" else seleccion
-
-
-def formatear_fecha(fecha_str):
-    """
-    Da formato legible a una fecha ingresada como cadena de 8 dígitos.
-    Si la fecha está en formato 'DDMMAAAA' (por ejemplo, '14072025'),
-    la convierte a formato 'DD/MM/AAAA'. Si no cumple el formato esperado,
-    la devuelve tal como fue ingresada.
-
-    Args:
-        fecha_str (str): Cadena que representa una fecha, idealmente de 8 dígitos.
-
-    Returns:
-        str: Fecha formateada como 'DD/MM/AAAA' o el valor original si no es válida.
-
-    Raises:
-        TypeError: Si el argumento no es una cadena.
-
-    """
-    #Se verifica que el dato sea texto
-    if not isinstance(fecha_str, str):
-        raise TypeError("La fecha debe ser una cadena de texto.")
-    #Si tiene 8 dígitos numéricos, se formatea como DD/MM/AAAA
-    if len(fecha_str) == 8 and fecha_str.isdigit():
-        return f"{fecha_str[:2]}/{fecha_str[2:4]}/{fecha_str[4:]}"
-    #Si no cumple con el formato esperado, devuelve valor original.
-    return fecha_str
-
-
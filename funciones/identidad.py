@@ -0,0 +1,249 @@
+import re
+import unicodedata
+from funciones.fechas import parsear_fecha
+
+#Unidades aceptadas en la presentación: unidad canónica y factor de conversión
+UNIDADES = {
+    "ml": ("ml", 1), "cc": ("ml", 1), "cl": ("ml", 10),
+    "l": ("ml", 1000), "lt": ("ml", 1000), "lts": ("ml", 1000),
+    "litro": ("ml", 1000), "litros": ("ml", 1000),
+    "g": ("g", 1), "gr": ("g", 1), "grs": ("g", 1),
+    "gramo": ("g", 1), "gramos": ("g", 1),
+    "k": ("g", 1000), "kg": ("g", 1000), "kgs": ("g", 1000),
+    "kilo": ("g", 1000), "kilos": ("g", 1000),
+}
+
+_PATRON_MEDIDA = re.compile(r"^(\d+(?:[.,]\d+)?)\s*([a-z]+)\.?$")
+
+#Índice identidad normalizada -> claves del producto, asociado a un diccionario de stock.
+#Cada identidad guarda sus claves en un dict usado como conjunto ordenado, y
+#_identidades guarda la identidad indexada de cada clave. El índice vale mientras
+#sea del mismo stock, con la misma cantidad de productos y la misma generación.
+_indice = {}
+_identidades = {}
+_stock_indexado = None
+_generacion = 0
+_generacion_indexada = -1
+
+
+def normalizar_texto(texto):
+    """
+    Normaliza un texto para compararlo: sin tildes, en minúsculas y con los
+    espacios colapsados.
+
+    Args:
+        texto (str): Texto a normalizar.
+
+    Returns:
+        str: Texto normalizado. Si se recibe None, se devuelve una cadena vacía.
+    """
+    if texto is None:
+        return ""
+    descompuesto = unicodedata.normalize("NFKD", str(texto))
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(sin_tildes.casefold().split())
+
+
+def normalizar_presentacion(presentacion):
+    """
+    Normaliza la presentación de un producto llevando las medidas a una unidad canónica.
+
+    Por ejemplo '1l', '1 LT' y '1000ml' se convierten en '1000ml', y '1k',
+    '1 KG' y '1000gr' en '1000g'. Las presentaciones que no son una medida
+    (como 'pack x 6') solo se normalizan como texto.
+
+    Args:
+        presentacion (str): Presentación tal como fue ingresada.
+
+    Returns:
+        str: Presentación normalizada.
+    """
+    texto = normalizar_texto(presentacion)
+    coincidencia = _PATRON_MEDIDA.match(texto)
+    if not coincidencia or coincidencia.group(2) not in UNIDADES:
+        return texto
+
+    unidad, factor = UNIDADES[coincidencia.group(2)]
+    valor = round(float(coincidencia.group(1).replace(",", ".")) * factor, 6)
+    return f"{valor:g}{unidad}"
+
+
+def identidad_producto(producto):
+    """
+    Calcula la identidad normalizada de un producto a partir de su nombre, marca y presentación.
+
+    Dos productos con la misma identidad son el mismo producto aunque su clave
+    difiera en mayúsculas, tildes, espacios o unidades.
+
+    Args:
+        producto (dict): Diccionario con al menos 'nombre', 'marca' y 'presentacion'.
+
+    Returns:
+        str: Identidad normalizada del producto.
+    """
+    return "|".join((
+        normalizar_texto(producto.get("nombre")),
+        normalizar_texto(producto.get("marca")),
+        normalizar_presentacion(producto.get("presentacion")),
+    ))
+
+
+def _reconstruir_indice(stock):
+    global _indice, _identidades, _stock_indexado, _generacion_indexada
+
+    _indice = {}
+    _identidades = {}
+    for clave, producto in stock.items():
+        identidad = identidad_producto(producto)
+        _indice.setdefault(identidad, {})[clave] = None
+        _identidades[clave] = identidad
+    _stock_indexado = stock
+    _generacion_indexada = _generacion
+
+
+def obtener_indice(stock):
+    """
+    Devuelve el índice identidad -> claves del inventario, reconstruyéndolo solo
+    si se trata de otro inventario, si cambió su cantidad de productos o si se
+    invalidó. Los tres controles son O(1).
+
+    Los cambios hechos a un producto sin pasar por `indexar_producto` no se
+    detectan solos: quien modifique el stock por otra vía debe llamar a
+    `indexar_producto` o a `invalidar_indice`.
+
+    Args:
+        stock (dict): Diccionario con los productos del inventario.
+
+    Returns:
+        dict: Índice de identidades normalizadas a las claves del stock que la comparten.
+    """
+    if _stock_indexado is not stock or _generacion_indexada != _generacion or len(_identidades) != len(stock):
+        _reconstruir_indice(stock)
+    return _indice
+
+
+def invalidar_indice():
+    """
+    Descarta el índice para que se reconstruya en la próxima búsqueda.
+
+    Returns:
+        None
+    """
+    global _generacion
+    _generacion += 1
+
+
+def buscar_clave_existente(stock, clave, producto):
+    """
+    Busca en el inventario un producto equivalente al recibido.
+
+    Primero se prueba la clave exacta y luego la identidad normalizada en el
+    índice, de modo que la búsqueda es O(1), también cuando el producto es nuevo.
+    Cada clave candidata se verifica contra el stock; si alguna ya no corresponde,
+    el índice se reconstruye una vez.
+
+    Args:
+        stock (dict): Diccionario con los productos del inventario.
+        clave (str): Clave generada para el producto nuevo.
+        producto (dict): Datos del producto nuevo.
+
+    Returns:
+        str or None: Clave del producto existente, o None si no hay uno equivalente.
+    """
+    if clave in stock:
+        return clave
+
+    identidad = identidad_producto(producto)
+    candidatas = obtener_indice(stock).get(identidad, {})
+    vigentes = [c for c in candidatas if c in stock and identidad_producto(stock[c]) == identidad]
+    #Si el índice quedó desactualizado por un cambio que no pasó por indexar_producto, se reconstruye una vez
+    if len(vigentes) != len(candidatas):
+        invalidar_indice()
+        vigentes = list(obtener_indice(stock).get(identidad, {}))
+    return vigentes[0] if vigentes else None
+
+
+def indexar_producto(stock, clave, identidad_anterior=None):
+    """
+    Actualiza el índice luego de agregar, editar o eliminar un producto del inventario.
+
+    Args:
+        stock (dict): Diccionario con los productos del inventario, ya modificado.
+        clave (str): Clave del producto afectado.
+        identidad_anterior (str, opcional): Identidad que tenía el producto antes del cambio.
+            Si no se pasa, se usa la que figura en el índice.
+
+    Returns:
+        None
+    """
+    #Si el índice es de otro inventario o se invalidó, se reconstruye en la próxima búsqueda
+    if _stock_indexado is not stock or _generacion_indexada != _generacion:
+        return
+
+    anterior = _identidades.pop(clave, identidad_anterior)
+    for identidad in {anterior, identidad_anterior} - {None}:
+        claves = _indice.get(identidad)
+        if claves is not None:
+            claves.pop(clave, None)
+            if not claves:
+                del _indice[identidad]
+
+    if clave in stock:
+        identidad = identidad_producto(stock[clave])
+        _indice.setdefault(identidad, {})[clave] = None
+        _identidades[clave] = identidad
+
+
+def deduplicar_stock(stock):
+    """
+    Fusiona los productos del inventario que tienen la misma identidad normalizada.
+
+    Se conserva la clave del primer producto encontrado. Las cantidades se suman,
+    el precio pasa a ser el del ingreso más reciente, el vencimiento el más próximo
+    y el stock mínimo el mayor de los fusionados.
+
+    Args:
+        stock (dict): Diccionario con los productos del inventario.
+
+    Returns:
+        tuple: Una tupla con dos elementos:
+            - dict: Nuevo inventario sin duplicados.
+            - dict: Claves fusionadas, de la forma {clave_conservada: [claves_fusionadas]}.
+    """
+    def ordinal(valor):
+        try:
+            return parsear_fecha(valor)
+        except (TypeError, ValueError):
+            return None
+
+    resultado = {}
+    por_identidad = {}
+    fusiones = {}
+
+    for clave, producto in stock.items():
+        identidad = identidad_producto(producto)
+        canonica = por_identidad.get(identidad)
+        #Primera vez que aparece la identidad, se conserva tal cual
+        if canonica is None:
+            por_identidad[identidad] = clave
+            resultado[clave] = dict(producto)
+            continue
+
+        base = resultado[canonica]
+        base["cantidad"] = base.get("cantidad", 0) + producto.get("cantidad", 0)
+        base["stock_minimo"] = max(base.get("stock_minimo", 0), producto.get("stock_minimo", 0))
+
+        ingreso_base = ordinal(base.get("fecha_ingreso"))
+        ingreso_nuevo = ordinal(producto.get("fecha_ingreso"))
+        if ingreso_nuevo is not None and (ingreso_base is None or ingreso_nuevo > ingreso_base):
+            base["precio"] = producto.get("precio", base.get("precio"))
+            base["fecha_ingreso"] = producto["fecha_ingreso"]
+
+        venc_base = ordinal(base.get("vencimiento"))
+        venc_nuevo = ordinal(producto.get("vencimiento"))
+        if venc_nuevo is not None and (venc_base is None or venc_nuevo < venc_base):
+            base["vencimiento"] = producto["vencimiento"]
+
+        fusiones.setdefault(canonica, []).append(clave)
+
+    return resultado, fusiones
@@ -0,0 +1,166 @@
+import json
+import math
+import os
+from datetime import date
+from funciones import archivos
+from funciones.archivos import leer_cambios_desde
+from funciones.fechas import hoy
+
+RUTA_PRONOSTICO = "Data/pronostico.json"
+
+#Suavizado exponencial del consumo diario y parámetros de reposición
+ALFA = 0.3
+PLAZO_ENTREGA_DIAS = 3
+DIAS_SEGURIDAD = 2
+DIAS_COBERTURA = 14
+
+
+def _leer_cache(ruta):
+    if not os.path.exists(ruta):
+        return {"posicion": 0, "productos": {}}
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        try:
+            return json.load(archivo)
+        except json.JSONDecodeError:
+            return {"posicion": 0, "productos": {}}
+
+
+def _avanzar(estado, dia):
+    """
+    Cierra los días transcurridos desde el último movimiento de un producto: el
+    consumo del último día entra al promedio suavizado y cada día sin movimientos
+    cuenta como consumo cero.
+    """
+    if dia <= estado["dia"]:
+        return
+    if estado["tasa"] is None:
+        estado["tasa"] = estado["consumo_dia"]
+    else:
+        estado["tasa"] = ALFA * estado["consumo_dia"] + (1 - ALFA) * estado["tasa"]
+    estado["tasa"] *= (1 - ALFA) ** (dia - estado["dia"] - 1)
+    estado["consumo_dia"] = 0
+    estado["dia"] = dia
+
+
+def actualizar_pronostico(ruta_cambios=None, ruta_cache=None):
+    """
+    Actualiza el consumo estimado de cada producto con los movimientos nuevos del
+    registro de cambios ('cambios.jsonl').
+
+    El resultado se guarda en 'pronostico.json' junto con la posición leída del
+    registro, así cada llamada procesa solo los movimientos que llegaron desde la
+    anterior. El consumo de un producto es la baja de su cantidad entre dos cambios
+    consecutivos; los ingresos y las transferencias entre almacenes no cuentan como consumo.
+
+    Args:
+        ruta_cambios (str, opcional): Registro de cambios. Por defecto, RUTA_CAMBIOS.
+        ruta_cache (str, opcional): Archivo de caché. Por defecto, RUTA_PRONOSTICO.
+
+    Returns:
+        dict: Estado por producto, de la forma {clave: {'cantidad', 'dia', 'consumo_dia', 'tasa'}}.
+    """
+    ruta_cambios = ruta_cambios or archivos.RUTA_CAMBIOS
+    ruta_cache = ruta_cache or RUTA_PRONOSTICO
+
+    cache = _leer_cache(ruta_cache)
+    #Si el registro se reemplazó por uno más corto, se recalcula desde el principio
+    if os.path.exists(ruta_cambios) and os.path.getsize(ruta_cambios) < cache["posicion"]:
+        cache = {"posicion": 0, "productos": {}}
+
+    entradas, posicion = leer_cambios_desde(ruta_cambios, cache["posicion"])
+    if not entradas:
+        return cache["productos"]
+
+    estados = cache["productos"]
+    for entrada in entradas:
+        clave = entrada["clave"]
+        producto = entrada["producto"]
+        #Si el producto se eliminó, se descarta su historial
+        if producto is None:
+            estados.pop(clave, None)
+            continue
+
+        try:
+            dia = date.fromisoformat(entrada["modificado"][:10]).toordinal()
+            cantidad = float(producto["cantidad"])
+        except (KeyError, TypeError, ValueError):
+            continue
+
+        estado = estados.get(clave)
+        if estado is None:
+            estados[clave] = {"cantidad": cantidad, "dia": dia, "consumo_dia": 0, "tasa": None}
+            continue
+
+        _avanzar(estado, dia)
+        if cantidad < estado["cantidad"] and entrada.get("motivo") != "transferencia":
+            estado["consumo_dia"] += estado["cantidad"] - cantidad
+        estado["cantidad"] = cantidad
+
+    cache["posicion"] = posicion
+    os.makedirs(os.path.dirname(ruta_cache) or ".", exist_ok=True)
+    with open(ruta_cache, "w", encoding="utf-8") as archivo:
+        json.dump(cache, archivo, ensure_ascii=False)
+    return estados
+
+
+def consumo_diario(estado, dia=None):
+    """
+    Devuelve el consumo diario estimado de un producto a una fecha, sin modificar su estado.
+
+    Solo se cuentan los días completos hasta el anterior a `dia`: lo consumido en
+    el día en curso todavía no entra al promedio.
+
+    Args:
+        estado (dict): Estado del producto devuelto por `actualizar_pronostico`.
+        dia (int, opcional): Fecha como ordinal. Por defecto, hoy.
+
+    Returns:
+        float: Unidades consumidas por día, según el promedio suavizado.
+    """
+    copia = dict(estado)
+    #Se cierran los días terminados hasta ayer; el día en curso queda afuera
+    _avanzar(copia, dia or hoy())
+    return copia["tasa"] or 0.0
+
+
+def sugerir_reposicion(stock, estados=None):
+    """
+    Calcula para todo el catálogo el punto de reposición y la cantidad a pedir de
+    cada producto según su consumo diario estimado.
+
+    El punto de reposición cubre el consumo durante el plazo de entrega más unos
+    días de seguridad. La cantidad a pedir lleva el stock hasta ese punto más
+    `DIAS_COBERTURA` días de consumo.
+
+    Args:
+        stock (dict): Diccionario con los productos del inventario.
+        estados (dict, opcional): Resultado de `actualizar_pronostico`. Si no se pasa, se actualiza.
+
+    Returns:
+        dict: {clave: {'consumo_diario', 'punto_reorden', 'cantidad_pedido'}}, solo de
+        los productos con consumo registrado.
+    """
+    if estados is None:
+        estados = actualizar_pronostico()
+
+    dia = hoy()
+    sugerencias = {}
+    for clave, producto in stock.items():
+        estado = estados.get(clave)
+        if estado is None:
+            continue
+        tasa = consumo_diario(estado, dia)
+        if tasa <= 0:
+            continue
+
+        punto = math.ceil(tasa * (PLAZO_ENTREGA_DIAS + DIAS_SEGURIDAD))
+        try:
+            faltante = punto + tasa * DIAS_COBERTURA - producto["cantidad"]
+        except (KeyError, TypeError):
+            continue
+        sugerencias[clave] = {
+            "consumo_diario": round(tasa, 2),
+            "punto_reorden": punto,
+            "cantidad_pedido": max(0, math.ceil(faltante)),
+        }
+    return sugerencias
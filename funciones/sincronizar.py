@@ -0,0 +1,188 @@
+import json
+import os
+from funciones.archivos import leer_json, guardar_json, agregar_cambios, registrar_en_log, leer_cambios_desde
+
+ARCHIVO_STOCK = "stock.json"
+ARCHIVO_CAMBIOS = "cambios.jsonl"
+ARCHIVO_SINCRONIZACION = "sincronizacion.json"
+ARCHIVO_LOG = "registro.log"
+
+
+def _ruta(directorio, archivo):
+    return os.path.join(directorio, archivo)
+
+
+def _orden(entrada):
+    """
+    Clave de comparación entre dos versiones de un mismo producto. Gana la modificación
+    más reciente; ante un empate, la versión más alta y, por último, el contenido,
+    para que el resultado sea el mismo sin importar el sentido de la sincronización.
+    """
+    return (
+        entrada.get("modificado") or "",
+        entrada.get("version") or 0,
+        json.dumps(entrada.get("producto"), sort_keys=True, ensure_ascii=False),
+    )
+
+
+def _ultimos_por_clave(entradas):
+    """
+    Se queda con el último cambio de cada producto.
+    """
+    ultimos = {}
+    for entrada in entradas:
+        actual = ultimos.get(entrada["clave"])
+        if actual is None or _orden(entrada) >= _orden(actual):
+            ultimos[entrada["clave"]] = entrada
+    return ultimos
+
+
+def _leer_puntos(directorio):
+    ruta = _ruta(directorio, ARCHIVO_SINCRONIZACION)
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        try:
+            return json.load(archivo)
+        except json.JSONDecodeError:
+            return {}
+
+
+def _guardar_puntos(directorio, puntos):
+    with open(_ruta(directorio, ARCHIVO_SINCRONIZACION), "w", encoding="utf-8") as archivo:
+        json.dump(puntos, archivo, indent=4, ensure_ascii=False)
+
+
+def _cambios_pendientes(directorio, posicion):
+    """
+    Devuelve los cambios de un directorio que el otro todavía no recibió y la
+    posición final del registro de cambios.
+
+    Si nunca se sincronizaron (posición None), el registro puede estar incompleto,
+    por ejemplo si se empezó a llevar con el catálogo ya cargado. En ese caso se
+    envía el estado completo de 'stock.json', más las eliminaciones del registro.
+    """
+    ruta_cambios = _ruta(directorio, ARCHIVO_CAMBIOS)
+    if posicion is not None:
+        return leer_cambios_desde(ruta_cambios, posicion)
+
+    entradas, fin = leer_cambios_desde(ruta_cambios, 0)
+    stock = leer_json(_ruta(directorio, ARCHIVO_STOCK))
+    lapidas = [entrada for entrada in entradas if entrada["producto"] is None]
+    return lapidas + [
+        {
+            "clave": clave,
+            "version": producto.get("version", 0),
+            "modificado": producto.get("modificado", ""),
+            "producto": producto,
+        }
+        for clave, producto in stock.items()
+    ], fin
+
+
+def _aplicar(directorio, entradas):
+    """
+    Aplica al stock de un directorio los cambios recibidos y los agrega a su registro de cambios.
+    'stock.json' se vuelve a escribir completo, aunque llegue un solo cambio.
+    Devuelve la cantidad de bytes agregados al registro.
+    """
+    if not entradas:
+        return 0
+
+    ruta_cambios = _ruta(directorio, ARCHIVO_CAMBIOS)
+    tamanio_previo = os.path.getsize(ruta_cambios) if os.path.exists(ruta_cambios) else 0
+    ruta_stock = _ruta(directorio, ARCHIVO_STOCK)
+    stock = leer_json(ruta_stock)
+    for entrada in entradas:
+        if entrada["producto"] is None:
+            stock.pop(entrada["clave"], None)
+        else:
+            stock[entrada["clave"]] = entrada["producto"]
+
+    guardar_json(stock, ruta_stock)
+    agregar_cambios(entradas, ruta_cambios)
+    return os.path.getsize(ruta_cambios) - tamanio_previo
+
+
+def sincronizar(directorio_a, directorio_b):
+    """
+    Sincroniza el stock de dos directorios intercambiando solo los cambios hechos
+    desde la última sincronización entre ambos.
+
+    Cada directorio guarda en 'sincronizacion.json' hasta qué posición de su
+    registro de cambios ya le envió al otro. La primera vez que se sincronizan se
+    envía el stock completo de cada lado. Si un mismo producto cambió en los dos
+    lados, gana la modificación más reciente (ver `_orden`), de forma determinística.
+    Las eliminaciones viajan como lápidas.
+
+    Leer los cambios cuesta según la cantidad de cambios nuevos, pero el lado que
+    recibe alguno vuelve a escribir su 'stock.json' completo.
+
+    Args:
+        directorio_a (str): Directorio con 'stock.json' y 'cambios.jsonl'.
+        directorio_b (str): Directorio con 'stock.json' y 'cambios.jsonl'.
+
+    Returns:
+        dict: Resumen con las claves 'a_hacia_b', 'b_hacia_a' y 'conflictos'
+        (cantidad de productos en cada caso).
+
+    Excepciones:
+        ValueError: Si ambos directorios son el mismo.
+    """
+    id_a = os.path.abspath(directorio_a)
+    id_b = os.path.abspath(directorio_b)
+    if id_a == id_b:
+        raise ValueError("No se puede sincronizar un directorio consigo mismo.")
+
+    puntos_a = _leer_puntos(directorio_a)
+    puntos_b = _leer_puntos(directorio_b)
+
+    #Cambios de cada lado desde la última sincronización entre ambos
+    cambios_a, fin_a = _cambios_pendientes(directorio_a, puntos_a.get(id_b))
+    cambios_b, fin_b = _cambios_pendientes(directorio_b, puntos_b.get(id_a))
+    ultimos_a = _ultimos_por_clave(cambios_a)
+    ultimos_b = _ultimos_por_clave(cambios_b)
+
+    #Se decide qué se envía a cada lado
+    para_b = []
+    para_a = []
+    conflictos = 0
+    for clave, entrada in ultimos_a.items():
+        otra = ultimos_b.get(clave)
+        if otra is None:
+            para_b.append(entrada)
+            continue
+        #Si ambos lados tienen el mismo cambio, no hay nada que enviar
+        if _orden(entrada) == _orden(otra):
+            continue
+        conflictos += 1
+        if _orden(entrada) > _orden(otra):
+            para_b.append(entrada)
+        elif _orden(otra) > _orden(entrada):
+            para_a.append(otra)
+    for clave, entrada in ultimos_b.items():
+        if clave not in ultimos_a:
+            para_a.append(entrada)
+
+    agregados_b = _aplicar(directorio_b, para_b)
+    agregados_a = _aplicar(directorio_a, para_a)
+
+    #El nuevo punto de sincronización incluye los cambios recién recibidos,
+    #para no devolverlos en la próxima vuelta
+    puntos_a[id_b] = fin_a + agregados_a
+    puntos_b[id_a] = fin_b + agregados_b
+    _guardar_puntos(directorio_a, puntos_a)
+    _guardar_puntos(directorio_b, puntos_b)
+
+    resumen = {"a_hacia_b": len(para_b), "b_hacia_a": len(para_a), "conflictos": conflictos}
+    registrar_en_log(
+        f"🔄 Sincronización con '{id_b}': {resumen['a_hacia_b']} enviados, "
+        f"{resumen['b_hacia_a']} recibidos, {resumen['conflictos']} conflictos.",
+        _ruta(directorio_a, ARCHIVO_LOG),
+    )
+    registrar_en_log(
+        f"🔄 Sincronización con '{id_a}': {resumen['b_hacia_a']} enviados, "
+        f"{resumen['a_hacia_b']} recibidos, {resumen['conflictos']} conflictos.",
+        _ruta(directorio_b, ARCHIVO_LOG),
+    )
+    return resumen
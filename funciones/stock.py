@@ -1,8 +1,11 @@
 import questionary
-from datetime import datetime, timedelta
 from funciones.menu import seleccionar_categoria
-from funciones.archivos import guardar_json, registrar_en_log
-from funciones.helpers import seleccionar_producto_por_nombre, formatear_fecha
+from funciones.archivos import registrar_en_log, registrar_cambio
+from funciones.almacenes import guardar_stock
+from funciones.helpers import seleccionar_producto_por_nombre
+from funciones.fechas import parsear_fecha, fecha_iso, fecha_legible, hoy, hoy_iso, es_fecha_iso
+from funciones.identidad import identidad_producto, buscar_clave_existente, indexar_producto
+from funciones.pronostico import sugerir_reposicion
 
 
 def ver_stock_completo(stock):
@@ -29,7 +32,7 @@ def ver_stock_completo(stock):
     for i, (clave, prod) in enumerate(stock.items(), 1):
         print(f"{i}. {clave}")
         print(f"   Categoría: {prod.get('categoria', 'No especificada')}")
-        print(f"   Ingreso: {prod.get('fecha_ingreso', 'N/D')} | Vencimiento: {prod.get('vencimiento', 'N/D')}")
+        print(f"   Ingreso: {fecha_legible(prod.get('fecha_ingreso', 'N/D'))} | Vencimiento: {fecha_legible(prod.get('vencimiento', 'N/D'))}")
         print(f"   Stock: {prod.get('cantidad', '?')} unidades (mínimo: {prod.get('stock_minimo', '?')})")
         print(f"   Precio: ${prod.get('precio', '?')}\n")
 
@@ -68,7 +71,7 @@ def ver_stock_por_categoria(stock):
 
     for i, (clave, datos) in enumerate(filtrados.items(), 1):
         print(f"{i}. {clave}")
-        print(f"   Ingreso: {datos['fecha_ingreso']} | Vencimiento: {datos['vencimiento']}")
+        print(f"   Ingreso: {fecha_legible(datos['fecha_ingreso'])} | Vencimiento: {fecha_legible(datos['vencimiento'])}")
         print(f"   Stock: {datos['cantidad']} unidades (mínimo: {datos['stock_minimo']})")
         print(f"   Precio: ${datos['precio']}\n")
         
@@ -105,8 +108,8 @@ def buscar_producto(stock):
     print(f"   Marca: {producto['marca']}")
     print(f"   Presentación: {producto['presentacion']}")
     print(f"   Categoría: {producto.get('categoria', 'No especificada')}")
-    print(f"   Fecha de ingreso: {producto['fecha_ingreso']}")
-    print(f"   Vencimiento: {producto['vencimiento']}")
+    print(f"   Fecha de ingreso: {fecha_legible(producto['fecha_ingreso'])}")
+    print(f"   Vencimiento: {fecha_legible(producto['vencimiento'])}")
     print(f"   Cantidad: {producto['cantidad']} unidades")
     print(f"   Stock mínimo: {producto['stock_minimo']}")
     print(f"   Precio: ${producto['precio']}")
@@ -181,8 +184,11 @@ def eliminar_producto(stock):
         return stock
     #Producto eliminado
     eliminado = stock.pop(clave)
+    indexar_producto(stock, clave, identidad_producto(eliminado))
+    #Registra la eliminación para la sincronización
+    registrar_cambio(clave, eliminado, eliminado=True)
     #Guarda el stock actualizado
-    guardar_json(stock)
+    guardar_stock(stock, [clave], eliminado.get("categoria", ""))
     #Refistra accion en log
     registrar_en_log(f"🗑 Producto eliminado: '{clave}' ({eliminado['marca']})")
     #Informa al usuario
@@ -219,6 +225,8 @@ def editar_producto(stock):
         return stock
 
     producto = stock[clave]
+    identidad_anterior = identidad_producto(producto)
+    categoria_anterior = producto.get("categoria", "")
     
     #Menú de campos disponibles para editar
     campo = questionary.select(
@@ -271,36 +279,42 @@ def editar_producto(stock):
  
     elif campo == "Fecha de ingreso":
         while True:
-            nueva_fecha = formatear_fecha(questionary.text("Fecha de ingreso (DDMMAAAA):").ask())
+            nueva_fecha = questionary.text("Fecha de ingreso (DDMMAAAA):").ask()
             try:
-                f = datetime.strptime(nueva_fecha, "%d/%m/%Y")
-                if f > datetime.today():
-                    print("❌ No puede ser futura.")
-                else:
-                    producto["fecha_ingreso"] = nueva_fecha
-                    break
-            except:
+                f = parsear_fecha(nueva_fecha)
+            except ValueError:
                 print("❌ Fecha inválida.")
+                continue
+            if f > hoy():
+                print("❌ No puede ser futura.")
+            else:
+                producto["fecha_ingreso"] = fecha_iso(nueva_fecha)
+                break
 
     elif campo == "Fecha de vencimiento":
         while True:
-            nueva_fecha = formatear_fecha(questionary.text("Fecha de vencimiento (DDMMAAAA):").ask())
+            nueva_fecha = questionary.text("Fecha de vencimiento (DDMMAAAA):").ask()
             try:
-                f_venc = datetime.strptime(nueva_fecha, "%d/%m/%Y")
-                f_ing = datetime.strptime(producto["fecha_ingreso"], "%d/%m/%Y")
-                if f_venc < f_ing:
-                    print("❌ No puede vencer antes del ingreso.")
-                else:
-                    producto["vencimiento"] = nueva_fecha
-                    break
-            except:
+                f_venc = parsear_fecha(nueva_fecha)
+                f_ing = parsear_fecha(producto["fecha_ingreso"])
+            except ValueError:
                 print("❌ Fecha inválida.")
+                continue
+            if f_venc < f_ing:
+                print("❌ No puede vencer antes del ingreso.")
+            else:
+                producto["vencimiento"] = fecha_iso(nueva_fecha)
+                break
 
     elif campo == "Categoría":
         producto["categoria"] = seleccionar_categoria()
 
-    #Guarda el stock actualizado y registra en el log
-    guardar_json(stock)
+    #Mantiene el índice de identidades si cambió la marca o la presentación
+    indexar_producto(stock, clave, identidad_anterior)
+
+    #Guarda el stock actualizado y registra en el log y en los cambios
+    registrar_cambio(clave, producto)
+    guardar_stock(stock, [clave], categoria_anterior, producto.get("categoria", ""))
     registrar_en_log(f"✏️ Producto editado: '{clave}' (campo: {campo})")
     print("✅ Producto actualizado correctamente.")
 
@@ -312,7 +326,9 @@ def agregar_insumos(stock):
 
     Los datos del producto se obtienen mediante un formulario interactivo.
     Si el producto ya existe, se suma la cantidad nueva a la existente y se actualiza el precio si es diferente.
-    Todos los cambios se registran en el archivo de log y se guardan en el archivo JSON.
+    Un producto existe si coincide su identidad normalizada (nombre, marca y presentación sin distinguir
+    mayúsculas, tildes, espacios ni unidades equivalentes), aunque la clave ingresada sea distinta.
+    Todos los cambios se registran en el archivo de log y en el registro de cambios, y se guardan en el archivo JSON.
 
     Args:
         stock (dict): Diccionario que representa el inventario actual.
@@ -331,8 +347,12 @@ def agregar_insumos(stock):
         print("❌ No se pudo agregar el producto.")
         return stock
     
+    #Busca un producto equivalente ya cargado, con el índice de identidades
+    existente = buscar_clave_existente(stock, clave, producto)
+
     #Si el producto ya existe en el stock
-    if clave in stock:
+    if existente is not None:
+        clave = existente
         # Suma cantidad nueva a existente
         stock[clave]["cantidad"] += producto["cantidad"]
 
@@ -346,10 +366,12 @@ def agregar_insumos(stock):
     # Si el producto no estaba en el stock, lo agrega como nuevo    
     else:
         stock[clave] = producto
+        indexar_producto(stock, clave)
         registrar_en_log(f"🆕 Se agregó un nuevo producto: '{clave}'.")
         print(f"✅ Producto nuevo agregado: {clave}")
 
-    guardar_json(stock)
+    registrar_cambio(clave, stock[clave])
+    guardar_stock(stock, [clave], stock[clave].get("categoria", ""))
     return stock
 
 def obtener_datos_producto():
@@ -360,6 +382,7 @@ def obtener_datos_producto():
     - La cantidad y el stock mínimo deben ser enteros válidos.
     - El precio debe ser un número decimal.
     - Las fechas deben estar en formato DDMMAAAA y tener lógica (el vencimiento posterior al ingreso).
+      Se guardan en el formato interno AAAA-MM-DD.
     - El stock mínimo no puede ser mayor que la cantidad.
 
     Returns:
@@ -404,28 +427,29 @@ def obtener_datos_producto():
 
     # Fecha de ingreso
     while True:
-        fecha_ingreso = formatear_fecha(questionary.text("Fecha de ingreso (DDMMAAAA):").ask())
+        fecha_ingreso = questionary.text("Fecha de ingreso (DDMMAAAA):").ask()
         try:
-            fecha_obj = datetime.strptime(fecha_ingreso, "%d/%m/%Y")
-            if fecha_obj > datetime.today():
-                print("❌ La fecha de ingreso no puede ser futura.")
-            else:
-                break
-        except:
+            f_ing = parsear_fecha(fecha_ingreso)
+        except ValueError:
             print("❌ Fecha inválida. Ingresá en formato DDMMAAAA.")
+            continue
+        if f_ing > hoy():
+            print("❌ La fecha de ingreso no puede ser futura.")
+        else:
+            break
 
     # Fecha de vencimiento, posterior al ingreso
     while True:
-        fecha_vencimiento = formatear_fecha(questionary.text("Fecha de vencimiento (DDMMAAAA):").ask())
+        fecha_vencimiento = questionary.text("Fecha de vencimiento (DDMMAAAA):").ask()
         try:
-            f_venc = datetime.strptime(fecha_vencimiento, "%d/%m/%Y")
-            f_ing = datetime.strptime(fecha_ingreso, "%d/%m/%Y")
-            if f_venc < f_ing:
-                print("❌ La fecha de vencimiento no puede ser anterior al ingreso.")
-            else:
-                break
-        except:
+            f_venc = parsear_fecha(fecha_vencimiento)
+        except ValueError:
             print("❌ Fecha inválida. Ingresá en formato DDMMAAAA.")
+            continue
+        if f_venc < f_ing:
+            print("❌ La fecha de vencimiento no puede ser anterior al ingreso.")
+        else:
+            break
 
     # Categoría con menú
     categoria = questionary.select(
@@ -441,8 +465,8 @@ def obtener_datos_producto():
         "cantidad": cantidad,
         "precio": precio,
         "stock_minimo": stock_minimo,
-        "vencimiento": fecha_vencimiento,
-        "fecha_ingreso": fecha_ingreso,
+        "vencimiento": fecha_iso(fecha_vencimiento),
+        "fecha_ingreso": fecha_iso(fecha_ingreso),
         "categoria": categoria,
     }
 
@@ -499,7 +523,12 @@ def mostrar_avisos(stock):
     o con una cantidad igual o menor al stock mínimo.
 
     El análisis se hace por fecha actual y compara con la fecha de vencimiento.
-    También revisa si la cantidad disponible es menor o igual al stock mínimo.
+    Las fechas guardadas ('AAAA-MM-DD') se comparan directamente como texto, sin
+    parsearlas, y los productos vencidos y por vencer se listan ordenados por
+    fecha de vencimiento.
+    También revisa si la cantidad disponible es menor o igual al stock mínimo y, junto
+    a esos avisos, muestra la cantidad sugerida para reponer según el consumo registrado.
+    Además avisa de los productos que llegaron al punto de reposición sugerido.
 
     Args:
         stock (dict): Diccionario que representa el inventario actual. Cada producto debe tener los campos:
@@ -515,52 +544,71 @@ def mostrar_avisos(stock):
     if not stock:
         print("\n📦 El inventario está vacío.")
         return
-    #Calcula la feha actual y el rango para los próximos 7 días.
-    hoy = datetime.today()
-    proximos_7_dias = hoy + timedelta(days=7)
+    #Calcula la feha actual y el rango para los próximos 7 días, en formato AAAA-MM-DD.
+    hoy_texto = hoy_iso()
+    proximos_7_dias = hoy_iso(7)
 
     vencidos = []
     por_vencer = []
     bajo_stock = []
 
     #Recorre cada producto del stock
-    for producto in stock.values():
+    for clave, producto in stock.items():
         # Valida que tenga los campos necesarios
         if "vencimiento" not in producto or "stock_minimo" not in producto:
             continue
 
         #Verifica la fecha de vencimiento
-        try:
-            fecha_venc = datetime.strptime(producto["vencimiento"], "%d/%m/%Y")
-            if fecha_venc < hoy:
-                vencidos.append(producto)
-            elif hoy <= fecha_venc <= proximos_7_dias:
-                por_vencer.append(producto)
-        except ValueError:
+        fecha_venc = producto["vencimiento"]
+        if not es_fecha_iso(fecha_venc):
             continue  # Fecha mal cargada
+        if fecha_venc < hoy_texto:
+            vencidos.append((fecha_venc, producto))
+        elif fecha_venc <= proximos_7_dias:
+            por_vencer.append((fecha_venc, producto))
 
         #Verifica si el producto tiene bajo stock
         try:
             if producto["cantidad"] <= producto["stock_minimo"]:
-                bajo_stock.append(producto)
-        except:
+                bajo_stock.append((clave, producto))
+        except (KeyError, TypeError):
             continue
 
+    #Sugerencias de reposición según el consumo registrado
+    sugerencias = sugerir_reposicion(stock)
+    claves_bajo_stock = {clave for clave, _ in bajo_stock}
+    a_reponer = [
+        (clave, stock[clave], sugerencia) for clave, sugerencia in sugerencias.items()
+        if clave not in claves_bajo_stock and stock[clave]["cantidad"] <= sugerencia["punto_reorden"]
+    ]
+
+    #Ordena por fecha de vencimiento
+    vencidos.sort(key=lambda par: par[0])
+    por_vencer.sort(key=lambda par: par[0])
+
     if vencidos:
         print("\n🔴 PRODUCTOS VENCIDOS:")
-        for p in vencidos:
-            print(f"- {p['nombre']} ({p['marca']}) venció el {p['vencimiento']}")
+        for _, p in vencidos:
+            print(f"- {p['nombre']} ({p['marca']}) venció el {fecha_legible(p['vencimiento'])}")
 
     if por_vencer:
         print("\n🟠 PRODUCTOS POR VENCER (próximos 7 días):")
-        for p in por_vencer:
-            print(f"- {p['nombre']} ({p['marca']}) vence el {p['vencimiento']}")
+        for _, p in por_vencer:
+            print(f"- {p['nombre']} ({p['marca']}) vence el {fecha_legible(p['vencimiento'])}")
 
     if bajo_stock:
         print("\n⚠️ PRODUCTOS CON STOCK BAJO:")
-        for p in bajo_stock:
+        for clave, p in bajo_stock:
             print(f"- {p['nombre']} ({p['marca']}): {p['cantidad']} unidades (mínimo: {p['stock_minimo']})")
+            if clave in sugerencias:
+                sugerencia = sugerencias[clave]
+                print(f"  ↳ Consumo: {sugerencia['consumo_diario']}/día. Sugerido pedir {sugerencia['cantidad_pedido']} unidades.")
+
+    if a_reponer:
+        print("\n🔁 PRODUCTOS EN PUNTO DE REPOSICIÓN (según consumo):")
+        for clave, p, sugerencia in a_reponer:
+            print(f"- {p['nombre']} ({p['marca']}): {p['cantidad']} unidades (punto de reposición: {sugerencia['punto_reorden']}). Sugerido pedir {sugerencia['cantidad_pedido']} unidades.")
 
-    if not (vencidos or por_vencer or bajo_stock):
+    if not (vencidos or por_vencer or bajo_stock or a_reponer):
         print("\n✅ No hay productos vencidos, por vencer ni con bajo stock.")
         
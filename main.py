@@ -1,6 +1,19 @@
+import argparse
+import os
+import tempfile
 from funciones.menu import mostrar_menu
 from funciones.stock import agregar_insumos, ver_stock_completo, ver_stock_por_categoria, buscar_producto, mostrar_avisos, editar_o_eliminar_producto
-from funciones.archivos import leer_json
+from funciones.archivos import leer_json, guardar_json, registrar_en_log, registrar_cambio, migrar_stock_json, RUTA_JSON
+from funciones.identidad import deduplicar_stock
+from funciones.almacenes import (
+    cargar_almacenes, usar_almacen, leer_stock, particionar_stock_json,
+    cantidad_total, productos_por_vencer, transferir,
+)
+from funciones.fechas import fecha_legible
+from funciones.exportar import FORMATOS, exportar
+from funciones.sincronizar import sincronizar
+from funciones.pronostico import sugerir_reposicion
+from funciones.carga import Guion, grabar_sesion, leer_sesion, reemplazar_questionary, ejecutar_carga, PERCENTILES
 
 
 def ejecutar_menu():
@@ -10,9 +23,10 @@ def ejecutar_menu():
     Luego, entra en un bucle que permite al usuario navegar por las distintas funciones
     del sistema: agregar productos, ver el inventario, buscar, editar, eliminar o
     volver a consultar los avisos. Finaliza cuando se elige la opción "Salir".
+    Trabaja sobre 'stock.json' o, si se eligió uno con `--almacen`, sobre los shards de ese almacén.
 
     """
-    stock = leer_json()
+    stock = leer_stock()
     
     mostrar_avisos(stock) #muestra avisos al inicio del programa
     
@@ -36,5 +50,287 @@ def ejecutar_menu():
             break
         else:
             print("❌ Opción inválida")
-            
-ejecutar_menu()
+
+
+def deduplicar():
+    """
+    Fusiona los productos duplicados del archivo 'stock.json' (misma identidad normalizada)
+    e informa por consola qué claves se fusionaron. Cada fusión se registra en el log.
+
+    """
+    original = leer_json()
+    stock, fusiones = deduplicar_stock(original)
+
+    if not fusiones:
+        print("✅ No se encontraron productos duplicados.")
+        return
+
+    print("\n🔗 PRODUCTOS FUSIONADOS:")
+    for clave, duplicadas in fusiones.items():
+        print(f"- {clave} ⟵ {', '.join(duplicadas)}")
+        registrar_en_log(f"🔗 Se fusionaron en '{clave}': {', '.join(repr(d) for d in duplicadas)}.")
+        #Se registran los cambios para la sincronización
+        registrar_cambio(clave, stock[clave])
+        for duplicada in duplicadas:
+            registrar_cambio(duplicada, original[duplicada], eliminado=True)
+
+    guardar_json(stock)
+    print(f"✅ Se fusionaron {sum(len(d) for d in fusiones.values())} productos duplicados.")
+
+
+def mostrar_total(nombre, marca, presentacion, procesos=None):
+    """
+    Muestra la cantidad total de un producto sumando todos los almacenes.
+
+    """
+    inventario = cargar_almacenes(procesos=procesos)
+    total, por_almacen = cantidad_total(
+        inventario, {"nombre": nombre, "marca": marca, "presentacion": presentacion}
+    )
+
+    if not por_almacen:
+        print("❌ El producto no está en ningún almacén.")
+        return
+
+    print(f"\n🏬 {nombre} ({marca}) - {presentacion}:")
+    for almacen, cantidad in por_almacen.items():
+        print(f"- {almacen}: {cantidad} unidades")
+    print(f"   Total: {total} unidades")
+
+
+def mostrar_vencimientos(dias, procesos=None):
+    """
+    Muestra los productos vencidos o por vencer de todos los almacenes.
+
+    """
+    inventario = cargar_almacenes(procesos=procesos)
+    productos = productos_por_vencer(inventario, dias)
+
+    if not productos:
+        print(f"\n✅ No hay productos vencidos ni por vencer en los próximos {dias} días.")
+        return
+
+    print(f"\n🟠 PRODUCTOS VENCIDOS O POR VENCER (próximos {dias} días):")
+    for almacen, clave, producto in productos:
+        print(f"- [{almacen}] {clave}: vence el {fecha_legible(producto['vencimiento'])}")
+
+
+def transferir_producto(clave, origen, destino, cantidad, crear_destino=False):
+    """
+    Transfiere una cantidad de un producto entre dos almacenes. Solo se cargan y
+    guardan los datos de esos dos almacenes.
+
+    """
+    inventario = cargar_almacenes([origen, destino])
+    try:
+        transferir(inventario, clave, origen, destino, cantidad, crear_destino)
+    except ValueError as error:
+        print(f"❌ {error}")
+        return
+    print(f"✅ Se transfirieron {cantidad} de '{clave}' de '{origen}' a '{destino}'.")
+
+
+def exportar_stock(args):
+    """
+    Exporta el stock a un archivo según las opciones de línea de comandos. Si se
+    indican almacenes se exportan sus shards; si no, el contenido de 'stock.json'.
+
+    """
+    if args.almacen:
+        inventario = cargar_almacenes(args.almacen, args.procesos)
+    else:
+        inventario = {"": leer_json()}
+
+    try:
+        cantidad = exportar(
+            inventario, args.salida, args.formato,
+            comprimir=True if args.gzip else None,
+            categoria=args.categoria, vence_en=args.vence_en, bajo_stock=args.bajo_stock,
+        )
+    except ValueError as error:
+        print(f"❌ {error}")
+        return
+    print(f"✅ Se exportaron {cantidad} productos a '{args.salida}'.")
+
+
+def sincronizar_con(otro, local=None):
+    """
+    Sincroniza el stock local con el de otro directorio, intercambiando solo los
+    cambios hechos desde la última sincronización.
+
+    """
+    local = local or os.path.dirname(RUTA_JSON)
+    try:
+        resumen = sincronizar(local, otro)
+    except ValueError as error:
+        print(f"❌ {error}")
+        return
+    print(
+        f"✅ Sincronización terminada: {resumen['a_hacia_b']} enviados, "
+        f"{resumen['b_hacia_a']} recibidos, {resumen['conflictos']} conflictos."
+    )
+
+
+def mostrar_pronostico():
+    """
+    Muestra el consumo diario estimado, el punto de reposición y la cantidad
+    sugerida a pedir de cada producto con consumo registrado.
+
+    """
+    stock = leer_stock()
+    sugerencias = sugerir_reposicion(stock)
+
+    if not sugerencias:
+        print("\n📈 Todavía no hay consumo registrado para sugerir reposiciones.")
+        return
+
+    print("\n📈 SUGERENCIAS DE REPOSICIÓN:")
+    for clave, sugerencia in sugerencias.items():
+        print(f"- {clave}: {stock[clave]['cantidad']} unidades | consumo {sugerencia['consumo_diario']}/día | "
+              f"punto de reposición {sugerencia['punto_reorden']} | pedir {sugerencia['cantidad_pedido']}")
+
+
+def probar_carga(args):
+    """
+    Ejecuta la prueba de carga de los flujos del menú y muestra las latencias
+    por flujo y el resultado de la verificación de invariantes.
+
+    """
+    directorio = args.directorio or tempfile.mkdtemp(prefix="carga_stock_")
+    resultado = ejecutar_carga(
+        directorio, args.operaciones, args.productos, args.procesos, args.semilla, args.compartido
+    )
+
+    print(f"\n⏱️ LATENCIAS POR FLUJO (ms) — datos en '{directorio}':")
+    columnas = " | ".join(f"p{p}" for p in PERCENTILES)
+    print(f"   flujo    | cantidad | {columnas} | max")
+    for flujo, datos in resultado["percentiles"].items():
+        valores = " | ".join(f"{datos[f'p{p}']:.2f}" for p in PERCENTILES)
+        print(f"   {flujo:<8} | {datos['cantidad']:>8} | {valores} | {datos['max']:.2f}")
+
+    if resultado["errores"]:
+        print("\n❌ INVARIANTES QUE NO SE CUMPLEN:")
+        for error in resultado["errores"]:
+            print(f"- {error}")
+        return False
+
+    print("\n✅ Invariantes verificados: stock.json válido, sin actualizaciones perdidas y log coincidente.")
+    return True
+
+
+def main(argv=None):
+    """
+    Punto de entrada del programa. Sin argumentos ejecuta el menú interactivo;
+    con un comando ejecuta la tarea correspondiente sin interacción.
+
+    Args:
+        argv (list, opcional): Argumentos de línea de comandos. Por defecto, los de `sys.argv`.
+
+    """
+    parser = argparse.ArgumentParser(description="Registro de stock del almacén.")
+    parser.add_argument(
+        "--almacen", dest="almacen_activo",
+        help="Usa el menú y el pronóstico sobre los shards de este almacén en lugar de stock.json.",
+    )
+    comandos = parser.add_subparsers(dest="comando")
+    comandos.add_parser("migrar", help="Convierte las fechas de stock.json al formato AAAA-MM-DD.")
+    comandos.add_parser("deduplicar", help="Fusiona productos duplicados en stock.json e informa qué se fusionó.")
+
+    particionar = comandos.add_parser("particionar", help="Reparte stock.json en los shards por categoría de un almacén.")
+    particionar.add_argument("almacen")
+
+    total = comandos.add_parser("total", help="Cantidad de un producto sumando todos los almacenes.")
+    total.add_argument("nombre")
+    total.add_argument("marca")
+    total.add_argument("presentacion")
+    total.add_argument("--procesos", type=int, default=None)
+
+    vencimientos = comandos.add_parser("vencimientos", help="Productos vencidos o por vencer de todos los almacenes.")
+    vencimientos.add_argument("--dias", type=int, default=7)
+    vencimientos.add_argument("--procesos", type=int, default=None)
+
+    transferencia = comandos.add_parser("transferir", help="Transfiere un producto entre almacenes.")
+    transferencia.add_argument("clave")
+    transferencia.add_argument("origen")
+    transferencia.add_argument("destino")
+    transferencia.add_argument("cantidad", type=float)
+    transferencia.add_argument("--crear-destino", action="store_true", help="Crea el almacén de destino si no existe.")
+
+    exportacion = comandos.add_parser("exportar", help="Exporta el stock a CSV, JSONL o XLSX.")
+    exportacion.add_argument("salida")
+    exportacion.add_argument("--formato", choices=FORMATOS, help="Por defecto, según la extensión de la salida.")
+    exportacion.add_argument("--gzip", action="store_true", help="Comprime la salida (implícito si termina en .gz).")
+    exportacion.add_argument("--categoria")
+    exportacion.add_argument("--vence-en", type=int, metavar="DIAS")
+    exportacion.add_argument("--bajo-stock", action="store_true")
+    exportacion.add_argument("--almacen", action="append", help="Almacén a exportar (se puede repetir).")
+    exportacion.add_argument("--procesos", type=int, default=None)
+
+    sincronizacion = comandos.add_parser("sincronizar", help="Intercambia los cambios con el stock de otro directorio.")
+    sincronizacion.add_argument("otro", help="Directorio con el stock.json a sincronizar.")
+    sincronizacion.add_argument("--local", help="Directorio local (por defecto, el de stock.json).")
+
+    comandos.add_parser("pronostico", help="Sugiere puntos de reposición y cantidades a pedir según el consumo.")
+
+    carga = comandos.add_parser("carga", help="Prueba de carga de los flujos del menú con respuestas automáticas.")
+    carga.add_argument("--operaciones", type=int, default=1000, help="Flujos a ejecutar por proceso.")
+    carga.add_argument("--productos", type=int, default=1000, help="Tamaño del inventario sintético.")
+    carga.add_argument("--procesos", type=int, default=1)
+    carga.add_argument("--semilla", type=int, default=0)
+    carga.add_argument("--directorio", help="Directorio para los datos de la prueba (por defecto, uno temporal).")
+    carga.add_argument("--compartido", action="store_true", help="Todos los procesos usan el mismo stock.json.")
+
+    grabacion = comandos.add_parser("grabar", help="Usa el menú normalmente y graba las respuestas en un archivo.")
+    grabacion.add_argument("sesion")
+
+    reproduccion = comandos.add_parser("reproducir", help="Reproduce en el menú una sesión grabada.")
+    reproduccion.add_argument("sesion")
+    reproduccion.add_argument("--no-estricto", action="store_true", help="No exige que las preguntas coincidan con las grabadas.")
+
+    args = parser.parse_args(argv)
+    if args.almacen_activo:
+        try:
+            usar_almacen(args.almacen_activo)
+        except ValueError as error:
+            print(f"❌ {error}")
+            return
+
+    if args.comando == "migrar":
+        convertidas = migrar_stock_json()
+        print(f"✅ Se migraron {convertidas} fechas al formato AAAA-MM-DD.")
+    elif args.comando == "deduplicar":
+        deduplicar()
+    elif args.comando == "particionar":
+        try:
+            cantidad = particionar_stock_json(args.almacen)
+        except ValueError as error:
+            print(f"❌ {error}")
+            return
+        print(f"✅ Se guardaron {cantidad} shards en el almacén '{args.almacen}'.")
+    elif args.comando == "total":
+        mostrar_total(args.nombre, args.marca, args.presentacion, args.procesos)
+    elif args.comando == "vencimientos":
+        mostrar_vencimientos(args.dias, args.procesos)
+    elif args.comando == "transferir":
+        transferir_producto(args.clave, args.origen, args.destino, args.cantidad, args.crear_destino)
+    elif args.comando == "exportar":
+        exportar_stock(args)
+    elif args.comando == "sincronizar":
+        sincronizar_con(args.otro, args.local)
+    elif args.comando == "pronostico":
+        mostrar_pronostico()
+    elif args.comando == "carga":
+        if not probar_carga(args):
+            raise SystemExit(1)
+    elif args.comando == "grabar":
+        with grabar_sesion(args.sesion):
+            ejecutar_menu()
+    elif args.comando == "reproducir":
+        with reemplazar_questionary(Guion(leer_sesion(args.sesion), estricto=not args.no_estricto)):
+            ejecutar_menu()
+    else:
+        ejecutar_menu()
+
+
+if __name__ == "__main__":
+    main()
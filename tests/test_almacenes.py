@@ -0,0 +1,62 @@
+import pytest
+
+from funciones import almacenes, archivos
+from funciones.archivos import registrar_cambio, leer_cambios_desde
+from funciones.pronostico import actualizar_pronostico
+
+
+@pytest.fixture
+def datos(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacenes, "RUTA_ALMACENES", str(tmp_path / "almacenes"))
+    monkeypatch.setattr(archivos, "RUTA_LOG", str(tmp_path / "registro.log"))
+    return tmp_path
+
+
+def _inventario(*destinos):
+    producto = {
+        "nombre": "yerba", "marca": "playadito", "presentacion": "1kg", "cantidad": 40,
+        "stock_minimo": 1, "precio": 100, "categoria": "Alimentos",
+    }
+    inventario = {"norte": {"yerba(playadito) - 1kg": producto}}
+    almacenes.guardar_shard(inventario, "norte", "Alimentos")
+    for destino in destinos:
+        inventario[destino] = {}
+        almacenes.guardar_shard(inventario, destino, "Alimentos")
+    return inventario
+
+
+def test_transferir_rechaza_un_destino_inexistente(datos):
+    inventario = _inventario("sur")
+
+    with pytest.raises(ValueError):
+        almacenes.transferir(inventario, "yerba(playadito) - 1kg", "norte", "srur", 10)
+    assert almacenes.listar_almacenes() == ["norte", "sur"]
+
+    almacenes.transferir(inventario, "yerba(playadito) - 1kg", "norte", "oeste", 10, crear_destino=True)
+    assert almacenes.cargar_almacenes(["oeste"])["oeste"]["yerba(playadito) - 1kg"]["cantidad"] == 10
+
+
+def test_transferir_registra_ambos_lados_y_no_cuenta_como_consumo(datos):
+    clave = "yerba(playadito) - 1kg"
+    inventario = _inventario("sur")
+    registrar_cambio(clave, inventario["norte"][clave], ruta=almacenes.ruta_cambios("norte"))
+
+    almacenes.transferir(inventario, clave, "norte", "sur", 30)
+
+    origen, _ = leer_cambios_desde(almacenes.ruta_cambios("norte"), 0)
+    destino, _ = leer_cambios_desde(almacenes.ruta_cambios("sur"), 0)
+    assert origen[-1]["motivo"] == "transferencia"
+    assert origen[-1]["producto"]["cantidad"] == 10
+    assert destino[-1]["motivo"] == "transferencia"
+    assert destino[-1]["producto"]["cantidad"] == 30
+    #Los shards guardados tienen la versión registrada
+    guardado = almacenes.cargar_almacenes(["norte"])["norte"][clave]
+    assert guardado["version"] == origen[-1]["version"]
+
+    #Un ingreso posterior tampoco es consumo
+    inventario["norte"][clave]["cantidad"] += 1
+    registrar_cambio(clave, inventario["norte"][clave], ruta=almacenes.ruta_cambios("norte"))
+
+    estados = actualizar_pronostico(almacenes.ruta_cambios("norte"), str(datos / "pronostico.json"))
+    assert estados[clave]["consumo_dia"] == 0
+    assert estados[clave]["cantidad"] == 11
@@ -0,0 +1,46 @@
+from funciones import archivos
+from funciones.archivos import leer_json, guardar_json, guardar_productos
+
+
+def _guardar_como(proceso, monkeypatch, stock, claves, ruta):
+    #Cada proceso lleva su propia cuenta de las escrituras que vio
+    monkeypatch.setattr(archivos, "_escrituras_vistas", proceso)
+    return sorted(guardar_productos(stock, claves, ruta))
+
+
+def test_guardar_productos_no_pisa_los_cambios_de_otro_proceso(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "stock.json")
+    guardar_json({"x": {"cantidad": 1}, "y": {"cantidad": 1}, "z": {"cantidad": 1}}, ruta)
+    vistas_uno, vistas_otro = {}, {}
+
+    #Dos procesos leen el mismo stock y cambian productos distintos
+    uno = leer_json(ruta)
+    otro = leer_json(ruta)
+    uno["x"]["cantidad"] = 5
+    assert _guardar_como(vistas_uno, monkeypatch, uno, ["x"], ruta) == []
+    del otro["z"]
+    otro["w"] = {"cantidad": 7}
+    assert _guardar_como(vistas_otro, monkeypatch, otro, ["z", "w"], ruta) == ["x"]
+
+    esperado = {"x": {"cantidad": 5}, "y": {"cantidad": 1}, "w": {"cantidad": 7}}
+    assert leer_json(ruta) == esperado
+    assert otro == esperado
+
+    #El primero ve los cambios del otro en su próximo guardado
+    uno["y"]["cantidad"] = 3
+    assert _guardar_como(vistas_uno, monkeypatch, uno, ["y"], ruta) == ["w", "z"]
+    assert leer_json(ruta) == dict(esperado, y={"cantidad": 3})
+    assert uno == leer_json(ruta)
+
+
+def test_guardar_productos_sin_otros_procesos_no_vuelve_a_leer(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "stock.json")
+    monkeypatch.setattr(archivos, "_escrituras_vistas", {})
+    stock = {"x": {"cantidad": 1}}
+    guardar_productos(stock, ["x"], ruta)
+
+    lecturas = []
+    monkeypatch.setattr(archivos, "leer_json", lambda ruta=None: lecturas.append(ruta) or {})
+    stock["x"]["cantidad"] = 2
+    assert guardar_productos(stock, ["x"], ruta) == []
+    assert lecturas == []
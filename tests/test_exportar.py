@@ -0,0 +1,80 @@
+import csv
+import gzip
+import json
+import zipfile
+from xml.dom import minidom
+
+import pytest
+
+from funciones import exportar as modulo
+from funciones.exportar import exportar, formato_de_ruta, _celda_xlsx
+
+
+def _inventario(cantidad):
+    return {"norte": {
+        f"p{i}": {"nombre": f"producto {i}", "cantidad": i, "stock_minimo": 5, "categoria": "Alimentos"}
+        for i in range(cantidad)
+    }}
+
+
+@pytest.mark.parametrize("ruta, esperado", [
+    ("stock.csv", "csv"),
+    ("stock.jsonl", "jsonl"),
+    ("stock.XLSX", "xlsx"),
+    ("stock.csv.gz", "csv"),
+    ("stock.jsonl.gz", "jsonl"),
+    ("stock.txt", "csv"),
+    ("stock", "csv"),
+])
+def test_formato_de_ruta(ruta, esperado):
+    assert formato_de_ruta(ruta) == esperado
+
+
+def test_celda_xlsx_numeros_y_texto():
+    assert _celda_xlsx(3) == "<c><v>3</v></c>"
+    assert _celda_xlsx(1.5) == "<c><v>1.5</v></c>"
+    assert _celda_xlsx(True) == '<c t="inlineStr"><is><t>True</t></is></c>'
+    assert _celda_xlsx("a & <b>") == '<c t="inlineStr"><is><t>a &amp; &lt;b&gt;</t></is></c>'
+
+
+@pytest.mark.parametrize("valor", [float("nan"), float("inf"), float("-inf")])
+def test_celda_xlsx_no_finitos_como_texto(valor):
+    assert _celda_xlsx(valor) == f'<c t="inlineStr"><is><t>{valor}</t></is></c>'
+
+
+def test_celda_xlsx_quita_caracteres_invalidos_en_xml():
+    assert _celda_xlsx("a\x00b\x0bc\tñ￾") == '<c t="inlineStr"><is><t>ab' + 'c\tñ</t></is></c>'
+
+
+def test_exportar_xlsx_genera_xml_valido(tmp_path):
+    inventario = _inventario(3)
+    inventario["norte"]["p0"]["nombre"] = "con \x01 control"
+    inventario["norte"]["p1"]["cantidad"] = float("nan")
+    ruta = str(tmp_path / "stock.xlsx")
+
+    assert exportar(inventario, ruta) == 3
+    with zipfile.ZipFile(ruta) as libro:
+        minidom.parseString(libro.read("xl/worksheets/sheet1.xml"))
+
+
+def test_exportar_xlsx_rechaza_mas_filas_que_una_hoja(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo, "MAX_FILAS_XLSX", 10)
+    ruta = tmp_path / "stock.xlsx"
+
+    assert exportar(_inventario(9), str(ruta)) == 9
+    with pytest.raises(ValueError):
+        exportar(_inventario(10), str(ruta))
+    assert not ruta.exists()
+
+
+def test_exportar_infiere_formato_y_comprime(tmp_path):
+    ruta_jsonl = tmp_path / "stock.jsonl.gz"
+    assert exportar(_inventario(5), str(ruta_jsonl), bajo_stock=True) == 5
+    with gzip.open(ruta_jsonl, "rt", encoding="utf-8") as archivo:
+        filas = [json.loads(linea) for linea in archivo]
+    assert [fila["clave"] for fila in filas] == ["p0", "p1", "p2", "p3", "p4"]
+
+    ruta_csv = tmp_path / "stock.csv"
+    assert exportar(_inventario(2), str(ruta_csv)) == 2
+    with open(ruta_csv, encoding="utf-8", newline="") as archivo:
+        assert [fila["almacen"] for fila in csv.DictReader(archivo)] == ["norte", "norte"]
@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+
+from funciones.fechas import parsear_fecha, fecha_iso, fecha_legible, es_fecha_iso, migrar_fechas
+
+
+@pytest.mark.parametrize("texto", ["14072025", "14/07/2025", "2025-07-14", " 14/07/2025 "])
+def test_parsear_fecha_acepta_los_formatos_de_ingreso_y_el_interno(texto):
+    assert parsear_fecha(texto) == date(2025, 7, 14).toordinal()
+
+
+@pytest.mark.parametrize("texto", ["31022025", "2025-13-40", "14-07-2025", "14/07/25", ""])
+def test_parsear_fecha_rechaza_fechas_invalidas(texto):
+    with pytest.raises(ValueError):
+        parsear_fecha(texto)
+
+
+def test_parsear_fecha_rechaza_valores_que_no_son_texto():
+    with pytest.raises(TypeError):
+        parsear_fecha(14072025)
+
+
+def test_fecha_iso_y_fecha_legible():
+    assert fecha_iso("01/02/2025") == "2025-02-01"
+    assert fecha_legible("2025-02-01") == "01/02/2025"
+    assert fecha_legible("sin fecha") == "sin fecha"
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("2025-07-14", True),
+    ("2025-13-40", False),
+    ("2025-02-30", False),
+    ("14/07/2025", False),
+    (None, False),
+    (["2025-07-14"], False),
+])
+def test_es_fecha_iso_valida_la_fecha_y_no_solo_la_forma(valor, esperado):
+    assert es_fecha_iso(valor) is esperado
+
+
+def test_migrar_fechas_convierte_las_validas_y_deja_las_invalidas():
+    stock = {
+        "a": {"fecha_ingreso": "01012025", "vencimiento": "2025-13-40"},
+        "b": {"fecha_ingreso": "2025-01-01", "vencimiento": "31/12/2025"},
+    }
+
+    assert migrar_fechas(stock) == 2
+    assert stock["a"] == {"fecha_ingreso": "2025-01-01", "vencimiento": "2025-13-40"}
+    assert stock["b"] == {"fecha_ingreso": "2025-01-01", "vencimiento": "2025-12-31"}
+    assert not es_fecha_iso(stock["a"]["vencimiento"])
@@ -0,0 +1,124 @@
+import pytest
+
+from funciones.identidad import (
+    normalizar_texto, normalizar_presentacion, identidad_producto,
+    buscar_clave_existente, indexar_producto, invalidar_indice, deduplicar_stock,
+)
+
+
+def _producto(nombre="yerba", marca="playadito", presentacion="1kg", **datos):
+    return dict(nombre=nombre, marca=marca, presentacion=presentacion, **datos)
+
+
+class _StockContado(dict):
+    """Stock que cuenta cuántas veces se recorre completo."""
+    recorridos = 0
+
+    def items(self):
+        self.recorridos += 1
+        return super().items()
+
+    def keys(self):
+        self.recorridos += 1
+        return super().keys()
+
+
+def test_normalizar_texto():
+    assert normalizar_texto("  Café   con LECHE ") == "cafe con leche"
+    assert normalizar_texto(None) == ""
+
+
+@pytest.mark.parametrize("presentacion, esperado", [
+    ("1l", "1000ml"),
+    ("1 LT", "1000ml"),
+    ("1000ml", "1000ml"),
+    ("1,5 l", "1500ml"),
+    ("1k", "1000g"),
+    ("1 KG", "1000g"),
+    ("1000gr", "1000g"),
+    ("0.5kg", "500g"),
+    ("pack x 6", "pack x 6"),
+    ("Pack  X 6", "pack x 6"),
+])
+def test_normalizar_presentacion(presentacion, esperado):
+    assert normalizar_presentacion(presentacion) == esperado
+
+
+def test_identidad_ignora_mayusculas_tildes_espacios_y_unidades():
+    assert identidad_producto(_producto("Azúcar", " LEDESMA ", "1 KG")) == \
+        identidad_producto(_producto("azucar", "ledesma", "1000g"))
+
+
+def test_buscar_clave_existente_por_identidad():
+    stock = {"yerba(playadito) - 1kg": _producto()}
+    assert buscar_clave_existente(stock, "YERBA(Playadito) - 1000 g", _producto("YERBA", "Playadito", "1000 g")) \
+        == "yerba(playadito) - 1kg"
+    assert buscar_clave_existente(stock, "mate(x) - 1kg", _producto("mate", "x")) is None
+
+
+def test_eliminar_uno_de_dos_equivalentes_encuentra_el_otro():
+    stock = {"a": _producto(), "b": _producto(presentacion="1000 g")}
+    assert buscar_clave_existente(stock, "nueva", _producto(presentacion="1 kilo")) == "a"
+
+    eliminado = stock.pop("a")
+    indexar_producto(stock, "a", identidad_producto(eliminado))
+
+    assert buscar_clave_existente(stock, "nueva", _producto(presentacion="1 kilo")) == "b"
+
+
+def test_editar_la_identidad_actualiza_el_indice():
+    stock = {"a": _producto()}
+    buscar_clave_existente(stock, "nueva", _producto())
+
+    anterior = identidad_producto(stock["a"])
+    stock["a"]["marca"] = "taragui"
+    indexar_producto(stock, "a", anterior)
+
+    assert buscar_clave_existente(stock, "nueva", _producto()) is None
+    assert buscar_clave_existente(stock, "nueva", _producto(marca="Taragüi")) == "a"
+
+
+def test_cambio_sin_indexar_se_corrige_con_invalidar_indice():
+    stock = {"a": _producto(), "b": _producto("mate")}
+    buscar_clave_existente(stock, "nueva", _producto())
+
+    stock["b"]["nombre"] = "yerba"
+    stock["a"]["nombre"] = "te"
+    invalidar_indice()
+
+    assert buscar_clave_existente(stock, "nueva", _producto()) == "b"
+
+
+def test_busqueda_de_producto_nuevo_no_recorre_el_stock():
+    stock = _StockContado({f"p{i}": _producto(f"producto {i}") for i in range(1000)})
+    buscar_clave_existente(stock, "nueva", _producto("nuevo 0"))
+    recorridos = stock.recorridos
+
+    for i in range(1, 50):
+        assert buscar_clave_existente(stock, "nueva", _producto(f"nuevo {i}")) is None
+    assert stock.recorridos == recorridos
+
+
+def test_deduplicar_stock_fusiona_segun_las_reglas():
+    stock = {
+        "a": _producto(cantidad=5, stock_minimo=2, precio=100,
+                       fecha_ingreso="2025-01-01", vencimiento="2026-06-01"),
+        "b": _producto(presentacion="1000 g", cantidad=3, stock_minimo=4, precio=120,
+                       fecha_ingreso="2025-03-01", vencimiento="2026-09-01"),
+        "c": _producto(presentacion="1 KG", cantidad=1, stock_minimo=1, precio=90,
+                       fecha_ingreso="2024-12-01", vencimiento="2026-02-01"),
+        "d": _producto("mate", cantidad=7),
+    }
+
+    resultado, fusiones = deduplicar_stock(stock)
+
+    assert fusiones == {"a": ["b", "c"]}
+    assert set(resultado) == {"a", "d"}
+    assert resultado["a"]["cantidad"] == 9
+    assert resultado["a"]["stock_minimo"] == 4
+    #Precio e ingreso del ingreso más reciente, vencimiento el más próximo
+    assert resultado["a"]["precio"] == 120
+    assert resultado["a"]["fecha_ingreso"] == "2025-03-01"
+    assert resultado["a"]["vencimiento"] == "2026-02-01"
+    #El inventario original no se modifica
+    assert stock["a"]["cantidad"] == 5
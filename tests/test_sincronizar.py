@@ -0,0 +1,95 @@
+import json
+
+from funciones.archivos import leer_json, guardar_json, registrar_cambio, leer_cambios_desde
+from funciones.sincronizar import sincronizar
+
+
+def _producto(nombre, cantidad):
+    return {
+        "nombre": nombre, "marca": "x", "presentacion": "1kg", "cantidad": cantidad,
+        "stock_minimo": 1, "precio": 100, "categoria": "Alimentos",
+        "fecha_ingreso": "2025-01-01", "vencimiento": "2026-01-01",
+    }
+
+
+def test_registro_existente_sin_sincronizar_envia_todo_el_catalogo(tmp_path):
+    a = tmp_path / "a"
+    b = tmp_path / "b"
+    a.mkdir()
+    b.mkdir()
+
+    #A tiene x e y, pero su registro de cambios solo tiene una edición de x
+    stock_a = {"x": _producto("x", 5), "y": _producto("y", 3)}
+    stock_a["x"]["cantidad"] = 4
+    registrar_cambio("x", stock_a["x"], ruta=str(a / "cambios.jsonl"))
+    guardar_json(stock_a, str(a / "stock.json"))
+    #B solo tiene x, sin editar
+    guardar_json({"x": _producto("x", 5)}, str(b / "stock.json"))
+
+    resumen = sincronizar(str(a), str(b))
+
+    stock_b = leer_json(str(b / "stock.json"))
+    assert set(stock_b) == {"x", "y"}
+    assert stock_b["x"]["cantidad"] == 4
+    assert resumen["a_hacia_b"] == 2
+
+    #Una segunda sincronización no tiene nada para intercambiar
+    assert sincronizar(str(a), str(b)) == {"a_hacia_b": 0, "b_hacia_a": 0, "conflictos": 0}
+    assert leer_json(str(a / "stock.json")) == stock_b
+
+
+def test_primera_sincronizacion_propaga_eliminaciones(tmp_path):
+    a = tmp_path / "a"
+    b = tmp_path / "b"
+    a.mkdir()
+    b.mkdir()
+
+    #A eliminó z después de que B lo copiara
+    z = _producto("z", 2)
+    registrar_cambio("z", dict(z), eliminado=True, ruta=str(a / "cambios.jsonl"))
+    guardar_json({}, str(a / "stock.json"))
+    guardar_json({"z": z}, str(b / "stock.json"))
+
+    sincronizar(str(a), str(b))
+
+    assert leer_json(str(b / "stock.json")) == {}
+    with open(b / "sincronizacion.json", encoding="utf-8") as archivo:
+        assert str(a) in json.load(archivo)
+
+
+def test_leer_cambios_saltea_lineas_danadas_y_la_ultima_incompleta(tmp_path):
+    ruta = tmp_path / "cambios.jsonl"
+    ruta.write_bytes(
+        b'{"clave": "x", "version": 1, "modificado": "", "producto": null}\n'
+        b'{"clave": "y", "vers\n'
+        b'[1, 2]\n'
+        b'{"clave": "z", "version": 1, "modificado": "", "producto": null}\n'
+        b'{"clave": "w"'
+    )
+
+    entradas, posicion = leer_cambios_desde(str(ruta), 0)
+
+    assert [entrada["clave"] for entrada in entradas] == ["x", "z"]
+    assert posicion == len(ruta.read_bytes()) - len(b'{"clave": "w"')
+
+
+def test_sincronizar_con_una_linea_danada_en_el_registro(tmp_path):
+    a = tmp_path / "a"
+    b = tmp_path / "b"
+    a.mkdir()
+    b.mkdir()
+
+    stock_a = {"x": _producto("x", 5)}
+    registrar_cambio("x", stock_a["x"], ruta=str(a / "cambios.jsonl"))
+    with open(a / "cambios.jsonl", "a", encoding="utf-8") as archivo:
+        archivo.write("{dañada\n")
+    guardar_json(stock_a, str(a / "stock.json"))
+    guardar_json({}, str(b / "stock.json"))
+
+    sincronizar(str(a), str(b))
+    stock_a["x"]["cantidad"] = 2
+    registrar_cambio("x", stock_a["x"], ruta=str(a / "cambios.jsonl"))
+    guardar_json(stock_a, str(a / "stock.json"))
+    sincronizar(str(a), str(b))
+
+    assert leer_json(str(b / "stock.json"))["x"]["cantidad"] == 2